@@ -1,11 +1,17 @@
 # documentation for tiktok api: https://github.com/oscie57/tiktok-voice/wiki
+import asyncio
 import base64
+import os
 import random
+import threading
 import time
 from typing import Final, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from TTS.aio import aiohttp, get_session
+from TTS.ratelimit import TokenBucket, backoff_delay
 from utils import settings
 
 __all__ = ["TikTok", "TikTokTTSException"]
@@ -64,6 +70,17 @@ non_eng_voices: Final[tuple] = (
     "kr_004",  # Korean - Male 2
 )
 
+DEFAULT_URI_BASE: Final[str] = (
+    "https://api16-normal-c-useast1a.tiktokv.com/media/api/text/speech/invoke/"
+)
+DEFAULT_REQUESTS_PER_SECOND: Final[float] = 4.0
+REQUEST_TIMEOUT: Final[int] = 30
+MAX_RETRIES: Final[int] = 5
+# HTTP statuses worth retrying; the API rate limits with 429 and has the odd bad gateway.
+RETRY_HTTP_STATUSES: Final[frozenset] = frozenset({429, 500, 502, 503, 504})
+# API status codes that a retry won't fix (see TikTokTTSException).
+PERMANENT_API_CODES: Final[frozenset] = frozenset({1, 2, 4})
+
 vocals: Final[tuple] = (
     "en_female_f08_salut_damour",  # Alto
     "en_male_m03_lobby",  # Tenor
@@ -86,23 +103,74 @@ class TikTok:
             "Cookie": f"sessionid={settings.config['settings']['tts']['tiktok_sessionid']}",
         }
 
-        self.URI_BASE = "https://api16-normal-c-useast1a.tiktokv.com/media/api/text/speech/invoke/"
+        # TIKTOK_TTS_URI points the client at another endpoint, e.g. a local stub for load tests.
+        self.URI_BASE = os.getenv("TIKTOK_TTS_URI", DEFAULT_URI_BASE)
         self.max_chars = 200
+        self.max_concurrency = 4
 
         self._session = requests.Session()
         # set the headers to the session, so we don't have to do it for every request
         self._session.headers = headers
+        # one pooled connection per request in flight; extra requests wait for a free one
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency, pool_block=True)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._in_flight = threading.BoundedSemaphore(self.max_concurrency)
 
-    def run(self, text: str, filepath: str, random_voice: bool = False):
-        if random_voice:
-            voice = self.random_voice()
-        else:
-            # if tiktok_voice is not set in the config file, then use a random voice
-            voice = settings.config["settings"]["tts"].get("tiktok_voice", None)
+        rate = settings.config["settings"]["tts"].get(
+            "tiktok_requests_per_second", DEFAULT_REQUESTS_PER_SECOND
+        )
+        self.limiter = TokenBucket(rate, burst=self.max_concurrency)
+        self.retries = 0
 
+    def run(self, text: str, filepath: str, random_voice: bool = False):
         # get the audio from the TikTok API
-        data = self.get_voices(voice=voice, text=text)
+        data = self.get_voices(voice=self._voice(random_voice), text=text)
+        self._save(data, filepath)
+
+    async def arun(self, text: str, filepath: str, random_voice: bool = False):
+        """Same as run, through the shared aiohttp session on the TTS loop."""
+        params = self._params(text, self._voice(random_voice))
+        session, headers = get_session(), dict(self._session.headers)
+        for attempt in range(MAX_RETRIES + 1):
+            await asyncio.sleep(self.limiter.reserve())
+            try:
+                async with session.post(
+                    self.URI_BASE,
+                    params=params,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                ) as response:
+                    status, retry_after = response.status, response.headers.get("Retry-After")
+                    try:
+                        data = await response.json(content_type=None)
+                    except ValueError:
+                        data = None
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = self._backoff(attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            delay = self._backoff(attempt, status, data, retry_after)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        if data is None:
+            raise TikTokTTSException(0, "Invalid response")
+        self._save(data, filepath)
+
+    def report(self) -> str:
+        return f"TikTok TTS: {self.limiter.summary()}, {self.retries} retries."
+
+    def _voice(self, random_voice: bool) -> Optional[str]:
+        if random_voice:
+            return self.random_voice()
+        # if tiktok_voice is not set in the config file, then use a random voice
+        return settings.config["settings"]["tts"].get("tiktok_voice", None)
 
+    @staticmethod
+    def _save(data: dict, filepath: str):
         # check if there was an error in the request
         status_code = data["status_code"]
         if status_code != 0:
@@ -122,8 +190,8 @@ class TikTok:
         with open(filepath, "wb") as out:
             out.write(decoded_voices)
 
-    def get_voices(self, text: str, voice: Optional[str] = None) -> dict:
-        """If voice is not passed, the API will try to use the most fitting voice"""
+    @staticmethod
+    def _params(text: str, voice: Optional[str] = None) -> dict:
         # sanitize text
         text = text.replace("+", "plus").replace("&", "and").replace("r/", "")
 
@@ -132,15 +200,76 @@ class TikTok:
 
         if voice is not None:
             params["text_speaker"] = voice
+        return params
 
-        # send request
-        try:
-            response = self._session.post(self.URI_BASE, params=params)
-        except ConnectionError:
-            time.sleep(random.randrange(1, 7))
-            response = self._session.post(self.URI_BASE, params=params)
+    def get_voices(self, text: str, voice: Optional[str] = None) -> dict:
+        """If voice is not passed, the API will try to use the most fitting voice"""
+        params = self._params(text, voice)
+
+        # send request, backing off on rate limits, server errors and dropped connections
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.acquire()
+            try:
+                with self._in_flight:
+                    response = self._session.post(
+                        self.URI_BASE, params=params, timeout=REQUEST_TIMEOUT
+                    )
+            except (requests.ConnectionError, requests.Timeout):
+                delay = self._backoff(attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+
+            try:
+                data = response.json()
+            except ValueError:
+                data = None
+            retry_after = response.headers.get("Retry-After")
+            delay = self._backoff(attempt, response.status_code, data, retry_after)
+            if delay is None:
+                return data if data is not None else response.json()
+            time.sleep(delay)
+
+    def _backoff(
+        self,
+        attempt: int,
+        http_status: Optional[int] = None,
+        data: Optional[dict] = None,
+        retry_after: Optional[str] = None,
+    ) -> Optional[float]:
+        """The retry policy get_voices and arun share.
 
-        return response.json()
+        Returns the seconds to wait before the next attempt, or None if there is none: the
+        response is final or the retries ran out. http_status is None for a dropped
+        connection or a timeout.
+        """
+        if attempt == MAX_RETRIES:
+            return None
+        if http_status is None:
+            delay = backoff_delay(attempt)
+        elif self._should_retry(http_status, data):
+            delay = self._retry_delay(attempt, retry_after)
+        else:
+            return None
+        self.retries += 1
+        return delay
+
+    @staticmethod
+    def _should_retry(http_status: int, data: Optional[dict]) -> bool:
+        if http_status in RETRY_HTTP_STATUSES:
+            return True
+        if not isinstance(data, dict):
+            return False
+        return data.get("status_code", 0) not in PERMANENT_API_CODES | {0}
+
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+        delay = backoff_delay(attempt)
+        try:
+            return max(delay, float(retry_after))
+        except (TypeError, ValueError):
+            return delay
 
     @staticmethod
     def random_voice() -> str:
@@ -0,0 +1,155 @@
+import asyncio
+import atexit
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from TTS.scheduler import DEFAULT_SYNTHESIS_WORKERS
+from utils import settings
+
+try:
+    import aiohttp
+except ModuleNotFoundError:  # optional; without it every provider goes through run()
+    aiohttp = None
+
+DEFAULT_MAX_CONNECTIONS: int = 32
+REQUEST_TIMEOUT: int = 120
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_session = None
+_lock = threading.Lock()
+# One asyncio semaphore per provider class, the coroutine twin of scheduler.provider_slots.
+_provider_slots: Dict[str, asyncio.Semaphore] = {}
+
+
+def supports_async(tts_module) -> bool:
+    """Whether the provider has ``async arun(text, filepath, random_voice)`` and it can run."""
+    return aiohttp is not None and asyncio.iscoroutinefunction(getattr(tts_module, "arun", None))
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Returns the process-wide TTS event loop, started on a daemon thread on first use."""
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="tts-aio", daemon=True).start()
+            atexit.register(_shutdown)
+        return _loop
+
+
+def run_async(coro: Awaitable):
+    """Runs a coroutine on the TTS event loop and waits for its result.
+
+    Must not be called from the loop's own thread.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result()
+
+
+def get_session():
+    """Returns the pooled aiohttp session every provider request shares.
+
+    Must be called from a coroutine on the TTS loop.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=DEFAULT_MAX_CONNECTIONS),
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+        )
+    return _session
+
+
+def provider_slots(tts_module) -> asyncio.Semaphore:
+    """Returns the semaphore capping the provider's requests in flight on the TTS loop.
+
+    Sized like scheduler.provider_slots, from the provider's ``max_concurrency``. Must be
+    used from a coroutine on the TTS loop.
+    """
+    name = type(tts_module).__name__
+    if name not in _provider_slots:
+        _provider_slots[name] = asyncio.Semaphore(
+            max(1, int(getattr(tts_module, "max_concurrency", 1)))
+        )
+    return _provider_slots[name]
+
+
+class AsyncScheduler:
+    """The coroutine counterpart of TTSScheduler, for providers with ``arun``.
+
+    Every job is submitted to the TTS loop at once. Coroutine jobs run on the loop itself and
+    plain functions on a small thread pool; either way at most ``max_workers`` jobs run at a
+    time, and the provider semaphore caps the requests they send.
+
+    Args:
+        tts_module              : The TTS provider instance, used to size the scheduler.
+        max_workers (Optional)  : Jobs running at once. Defaults to the provider's
+                                  ``max_concurrency``.
+    """
+
+    def __init__(self, tts_module, max_workers: int = None):
+        if max_workers is None:
+            max_workers = getattr(tts_module, "max_concurrency", 1)
+        self.max_workers = max(1, int(max_workers))
+        pool_size = settings.config["settings"]["tts"].get(
+            "synthesis_workers", DEFAULT_SYNTHESIS_WORKERS
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, min(int(pool_size), self.max_workers)), thread_name_prefix="tts"
+        )
+        self._loop = get_loop()
+        self._running: Optional[asyncio.Semaphore] = None
+        self._futures = []
+        self._closed = False
+
+    def submit(self, fn: Callable, *args) -> Future:
+        future = asyncio.run_coroutine_threadsafe(self._run(fn, args), self._loop)
+        self._futures.append(future)
+        return future
+
+    def ordered(self, jobs: Iterable[Tuple[Callable, tuple]]) -> Iterator:
+        """Yields the result of every (fn, args) job in the order the jobs were given.
+
+        Jobs still waiting for a turn when the consumer stops iterating are dropped; the
+        ones already running finish during shutdown, as with TTSScheduler.
+        """
+        pending = deque(self.submit(fn, *args) for fn, args in jobs)
+        try:
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            self._closed = True
+
+    async def _run(self, fn: Callable, args: tuple):
+        if self._running is None:
+            self._running = asyncio.Semaphore(self.max_workers)
+        async with self._running:
+            if self._closed:
+                return None
+            if asyncio.iscoroutinefunction(fn):
+                return await fn(*args)
+            return await self._loop.run_in_executor(self._executor, fn, *args)
+
+    def shutdown(self):
+        self._closed = True
+        wait_futures(self._futures)
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.shutdown()
+
+
+def _shutdown():
+    if _loop is None or not _loop.is_running():
+        return
+    if _session is not None and not _session.closed:
+        try:
+            asyncio.run_coroutine_threadsafe(_session.close(), _loop).result(timeout=5)
+        except Exception:
+            pass
+    _loop.call_soon_threadsafe(_loop.stop)
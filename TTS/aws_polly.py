@@ -1,7 +1,9 @@
 import random
 import sys
+import threading
 
 from boto3 import Session
+from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError, ProfileNotFound
 
 from utils import settings
@@ -28,12 +30,34 @@ voices = [
 class AWSPolly:
     def __init__(self):
         self.max_chars = 3000
+        self.max_concurrency = 8
+        self.engine = "neural"
         self.voices = voices
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """The Polly client, created once and shared by every thread of this instance.
+
+        boto3 clients are thread-safe (sessions are not), so all concurrent chunks reuse its
+        resolved credentials and pooled TLS connections.
+        """
+        with self._client_lock:
+            if self._client is None:
+                self._client = Session(profile_name="polly").client(
+                    "polly",
+                    config=Config(
+                        max_pool_connections=self.max_concurrency * 2,
+                        retries={"max_attempts": 3, "mode": "standard"},
+                        tcp_keepalive=True,
+                    ),
+                )
+            return self._client
 
     def run(self, text, filepath, random_voice: bool = False):
         try:
-            session = Session(profile_name="polly")
-            polly = session.client("polly")
+            polly = self.client
             if random_voice:
                 voice = self.randomvoice()
             else:
@@ -45,7 +69,7 @@ class AWSPolly:
             try:
                 # Request speech synthesis
                 response = polly.synthesize_speech(
-                    Text=text, OutputFormat="mp3", VoiceId=voice, Engine="neural"
+                    Text=text, OutputFormat="mp3", VoiceId=voice, Engine=self.engine
                 )
             except (BotoCoreError, ClientError) as error:
                 # The service returned an error, exit gracefully
@@ -73,5 +97,8 @@ class AWSPolly:
             )
             sys.exit(-1)
 
+    def cache_params(self) -> str:
+        return self.engine
+
     def randomvoice(self):
         return random.choice(self.voices)
@@ -0,0 +1,174 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from utils import settings
+
+DEFAULT_CACHE_DIR: str = "assets/tts_cache"
+DEFAULT_CACHE_MAX_MB: int = 512
+
+# The config key holding the voice each provider speaks with, used as part of the cache key.
+_VOICE_SETTINGS = {
+    "TikTok": "tiktok_voice",
+    "AWSPolly": "aws_polly_voice",
+    "StreamlabsPolly": "streamlabs_polly_voice",
+    "elevenlabs": "elevenlabs_voice_name",
+    "pyttsx": "python_voice",
+}
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(str(text).split())
+
+
+def voice_for(tts_module, random_voice: bool) -> str:
+    """Returns the voice a provider will use, as far as it can be known before synthesis."""
+    if random_voice:
+        # The provider picks the voice itself; any cached clip is an equally valid random pick.
+        return "random"
+    setting = _VOICE_SETTINGS.get(type(tts_module).__name__)
+    if setting:
+        return str(settings.config["settings"]["tts"].get(setting, ""))
+    # Qwen3Clone speaks with whatever reference clip it was given.
+    return str(getattr(tts_module, "ref_audio", ""))
+
+
+def params_for(tts_module) -> str:
+    """Returns the provider's other settings that change its audio (model, engine, speed...).
+
+    Providers list them through an optional ``cache_params()`` method.
+    """
+    cache_params = getattr(tts_module, "cache_params", None)
+    return str(cache_params()) if callable(cache_params) else ""
+
+
+def is_degraded(tts_module, filepath: str) -> bool:
+    """Returns whether the clip the provider just wrote at filepath is only a stand-in.
+
+    Providers that write something in place of audio they failed to synthesize (e.g. a
+    moment of silence, so the video can still be made) say so through an optional
+    ``degraded(filepath)`` method. Such clips must not be cached, or every later run would
+    replay the stand-in instead of trying the synthesis again.
+    """
+    degraded = getattr(tts_module, "degraded", None)
+    return bool(degraded(filepath)) if callable(degraded) else False
+
+
+class TTSCache:
+    """Content-addressed on-disk store of synthesized clips, shared by every run.
+
+    Args:
+        directory (Optional) : Where the cached clips live.
+        max_bytes (Optional) : Size budget. The least recently used clips are evicted past it.
+
+    Notes:
+        Clips are copied into place on a hit, never linked: providers and ffmpeg open their
+        output for writing in place, which would rewrite a linked cache entry.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes if max_bytes is not None else DEFAULT_CACHE_MAX_MB * 1024**2
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # file name -> size, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        for entry in sorted(
+            (e for e in os.scandir(self.directory) if e.is_file() and not e.name.startswith(".")),
+            key=lambda e: e.stat().st_mtime,
+        ):
+            size = entry.stat().st_size
+            self._entries[entry.name] = size
+            self._size += size
+
+    @staticmethod
+    def key(provider: str, voice: str, language: str, text: str, params: str = "") -> str:
+        fields = (provider, voice, language, normalize_text(text))
+        if params:
+            # Kept out when empty so the keys of providers without settings stay the same.
+            fields += (params,)
+        digest = hashlib.sha256("\0".join(fields).encode("utf-8")).hexdigest()
+        return f"{provider}-{digest[:40]}"
+
+    def fetch(self, key: str, filepath: str) -> bool:
+        """Puts the cached clip for key at filepath. Returns False on a miss."""
+        name = key + Path(filepath).suffix
+        with self._lock:
+            if name not in self._entries:
+                self.misses += 1
+                return False
+            self._entries.move_to_end(name)
+            self.hits += 1
+        cached = self.directory / name
+        try:
+            os.utime(cached)
+            if os.path.lexists(filepath):
+                os.remove(filepath)
+            shutil.copyfile(cached, filepath)
+        except FileNotFoundError:
+            # Evicted (or removed by hand) since we looked; treat it as a miss.
+            with self._lock:
+                self._forget(name)
+                self.hits -= 1
+                self.misses += 1
+            return False
+        return True
+
+    def store(self, key: str, filepath: str):
+        """Copies a freshly synthesized clip into the cache and evicts old clips if needed."""
+        if not os.path.isfile(filepath) or os.path.getsize(filepath) == 0:
+            return
+        name = key + Path(filepath).suffix
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(filepath, tmp)
+            os.replace(tmp, self.directory / name)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        size = os.path.getsize(self.directory / name)
+        with self._lock:
+            self._forget(name)
+            self._entries[name] = size
+            self._size += size
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._forget(oldest)
+                try:
+                    os.remove(self.directory / oldest)
+                except OSError:
+                    pass
+
+    def _forget(self, name: str):
+        size = self._entries.pop(name, None)
+        if size is not None:
+            self._size -= size
+
+
+_cache: Optional[TTSCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[TTSCache]:
+    """Returns the process-wide TTS cache, or None if it is disabled in the config."""
+    global _cache
+    tts_cfg = settings.config["settings"]["tts"]
+    if not tts_cfg.get("tts_cache", True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            max_mb = float(tts_cfg.get("tts_cache_max_mb", DEFAULT_CACHE_MAX_MB))
+            _cache = TTSCache(max_bytes=int(max_mb * 1024**2))
+        return _cache
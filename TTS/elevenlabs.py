@@ -3,13 +3,20 @@ import random
 from elevenlabs import save
 from elevenlabs.client import ElevenLabs
 
+from TTS.aio import get_session
 from utils import settings
 
+API_URL = "https://api.elevenlabs.io/v1"
+
 
 class elevenlabs:
     def __init__(self):
         self.max_chars = 2500
+        self.max_concurrency = 2
+        self.model = "eleven_multilingual_v1"
         self.client: ElevenLabs = None
+        # Voice name -> voice ID, fetched once by arun.
+        self._voice_ids = None
 
     def run(self, text, filepath, random_voice: bool = False):
         if self.client is None:
@@ -17,20 +24,53 @@ class elevenlabs:
         if random_voice:
             voice = self.randomvoice()
         else:
-            voice = str(settings.config["settings"]["tts"]["elevenlabs_voice_name"]).capitalize()
+            voice = self._voice_name()
 
-        audio = self.client.generate(text=text, voice=voice, model="eleven_multilingual_v1")
+        audio = self.client.generate(text=text, voice=voice, model=self.model)
         save(audio=audio, filename=filepath)
 
+    async def arun(self, text, filepath, random_voice: bool = False):
+        """Same as run, sent to the REST API through the shared aiohttp session on the TTS loop.
+
+        The SDK's async client brings its own HTTP client, so it can't share the session.
+        """
+        session, headers = get_session(), {"xi-api-key": self._api_key()}
+        if self._voice_ids is None:
+            async with session.get(f"{API_URL}/voices", headers=headers) as response:
+                response.raise_for_status()
+                voices = (await response.json())["voices"]
+            self._voice_ids = {voice["name"]: voice["voice_id"] for voice in voices}
+        voice = random.choice(list(self._voice_ids)) if random_voice else self._voice_name()
+        # Like the SDK, take a voice that isn't one of the account's names to be an ID.
+        voice_id = self._voice_ids.get(voice, voice)
+
+        async with session.post(
+            f"{API_URL}/text-to-speech/{voice_id}",
+            headers=headers,
+            json={"text": text, "model_id": self.model},
+        ) as response:
+            response.raise_for_status()
+            with open(filepath, "wb") as f:
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    f.write(chunk)
+
+    def cache_params(self) -> str:
+        return self.model
+
     def initialize(self):
+        self.client = ElevenLabs(api_key=self._api_key())
+
+    @staticmethod
+    def _api_key() -> str:
         if settings.config["settings"]["tts"]["elevenlabs_api_key"]:
-            api_key = settings.config["settings"]["tts"]["elevenlabs_api_key"]
-        else:
-            raise ValueError(
-                "You didn't set an Elevenlabs API key! Please set the config variable ELEVENLABS_API_KEY to a valid API key."
-            )
+            return settings.config["settings"]["tts"]["elevenlabs_api_key"]
+        raise ValueError(
+            "You didn't set an Elevenlabs API key! Please set the config variable ELEVENLABS_API_KEY to a valid API key."
+        )
 
-        self.client = ElevenLabs(api_key=api_key)
+    @staticmethod
+    def _voice_name() -> str:
+        return str(settings.config["settings"]["tts"]["elevenlabs_voice_name"]).capitalize()
 
     def randomvoice(self):
         if self.client is None:
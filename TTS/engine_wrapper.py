@@ -1,30 +1,31 @@
 import os
 import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Optional, Pattern, Set, Tuple
 
 import numpy as np
-import translators
-try:
-    from moviepy.audio.AudioClip import AudioClip
-except ModuleNotFoundError:
-    from moviepy import AudioClip
-
-try:
-    from moviepy.audio.fx.volumex import volumex
-except ModuleNotFoundError:
-    volumex = None
-
-try:
-    from moviepy.editor import AudioFileClip
-except ModuleNotFoundError:
-    from moviepy import AudioFileClip
 from rich.progress import track
 
+from TTS import aio
+from TTS.cache import get_cache, is_degraded, params_for, voice_for
+from TTS.planner import BudgetPlanner
+from TTS.scheduler import TTSScheduler, held_slots, provider_slots
 from utils import settings
+from utils.audio import (
+    decode_pcm,
+    get_duration,
+    get_format,
+    silence_file,
+    silence_samples,
+    write_wav,
+)
 from utils.console import print_step, print_substep
-from utils.voice import sanitize_text
+from utils.manifest import write_manifest
+from utils.translation import translate, translate_many
+from utils.voice import normalize_body, sanitize_text, split_sentences
 
 DEFAULT_MAX_LENGTH: int = (
     50  # Video length variable, edit this on your own risk. It should work, but it's not supported
@@ -48,6 +49,25 @@ DEFAULT_PROFANITY_WORDS = {
 }
 
 
+# Clips the engine assembles itself (censored or split ones) are 44.1 kHz mono WAV.
+PCM_SAMPLE_RATE: int = 44100
+
+_WHITESPACE_SPLIT = re.compile(r"(\s+)")
+_NON_WORD_CHARS = re.compile(r"[^a-zA-Z0-9']")
+
+
+@lru_cache(maxsize=8)
+def profanity_matcher(censored_words: str = "") -> Pattern:
+    """Compiles the default and the configured censored words into one regex.
+
+    A cleaned, lowercased token is profanity if it is one of the words followed by at most
+    three more characters (e.g. "shits", "fuckers").
+    """
+    custom_words = {w.strip().lower() for w in censored_words.split(",") if w and w.strip()}
+    words = sorted(DEFAULT_PROFANITY_WORDS.union(custom_words), key=len, reverse=True)
+    return re.compile("(?:" + "|".join(map(re.escape, words)) + ")[a-z0-9']{0,3}")
+
+
 class TTSEngine:
     """Calls the given TTS engine to reduce code duplication and allow multiple TTS engines.
 
@@ -77,312 +97,471 @@ class TTSEngine:
         self.max_length = max_length
         self.length = 0
         self.last_clip_length = last_clip_length
+        self.manifest = []
+        # What the engine adds to the speech, so the planner calibrates on the speech alone:
+        # seconds of padding per clip, and the clips that had censored words cut out.
+        self._padding: Dict[str, float] = {}
+        self._censored: Set[str] = set()
+        self.cache = get_cache()
+        tts_cfg = settings.config["settings"]["tts"]
+        self.use_async = bool(tts_cfg.get("async_tts", True)) and aio.supports_async(self.tts_module)
+        # Providers write their native format ("mp3" unless they set audio_format). Anything
+        # the engine has to re-assemble is kept as WAV, so no clip is encoded twice.
+        self.provider_format = getattr(self.tts_module, "audio_format", "mp3")
+        censor = bool(tts_cfg.get("censor_swear_words", False))
+        self.clip_format = "wav" if censor else self.provider_format
+        self.planner = None
+        if tts_cfg.get("plan_comments", True):
+            voice = voice_for(self.tts_module, tts_cfg["random_voice"])
+            self.planner = BudgetPlanner(f"{type(self.tts_module).__name__}:{voice}")
 
     def add_periods(
         self,
     ):  # adds periods to the end of paragraphs (where people often forget to put them) so tts doesn't blend sentences
         for comment in self.reddit_object["comments"]:
-            # remove links
-            regex_urls = r"((http|https)\:\/\/)?[a-zA-Z0-9\.\/\?\:@\-_=#]+\.([a-zA-Z]){2,6}([a-zA-Z0-9\.\&\/\?\:@\-_=#])*"
-            comment["comment_body"] = re.sub(regex_urls, " ", comment["comment_body"])
-            comment["comment_body"] = comment["comment_body"].replace("\n", ". ")
-            comment["comment_body"] = re.sub(r"\bAI\b", "A.I", comment["comment_body"])
-            comment["comment_body"] = re.sub(r"\bAGI\b", "A.G.I", comment["comment_body"])
-            if comment["comment_body"][-1] != ".":
-                comment["comment_body"] += "."
-            comment["comment_body"] = comment["comment_body"].replace(". . .", ".")
-            comment["comment_body"] = comment["comment_body"].replace(".. . ", ".")
-            comment["comment_body"] = comment["comment_body"].replace(". . ", ".")
-            comment["comment_body"] = re.sub(r'\."\.', '".', comment["comment_body"])
+            comment["comment_body"] = normalize_body(comment["comment_body"])
 
     def run(self) -> Tuple[int, int]:
         Path(self.path).mkdir(parents=True, exist_ok=True)
         print_step("Saving Text to MP3 files...")
 
         self.add_periods()
-        self.call_tts("title", process_text(self.reddit_object["thread_title"]))
-        # processed_text = ##self.reddit_object["thread_post"] != ""
+        if self.cache is not None:
+            cache_counts = (self.cache.hits, self.cache.misses)
+        config = settings.config["settings"]
+        hybrid_mode = config.get("hybrid_mode", False)
         idx = 0
 
-        # Handle hybrid mode - process both post content and comments
-        if settings.config["settings"].get("hybrid_mode", False):
-            # First process the post content
-            if settings.config["settings"]["storymodemethod"] == 0:
-                if len(self.reddit_object["thread_post"]) > self.tts_module.max_chars:
-                    self.split_post(self.reddit_object["thread_post"], "postaudio")
-                else:
-                    self.call_tts("postaudio", process_text(self.reddit_object["thread_post"]))
-            elif settings.config["settings"]["storymodemethod"] == 1:
-                for idx, text in track(enumerate(self.reddit_object["thread_post"])):
-                    self.call_tts(f"postaudio-{idx}", process_text(text))
-            
-            # Then process the comments
-            comment_start_idx = idx + 1 if settings.config["settings"]["storymodemethod"] == 1 else 1
-            for comment_idx, comment in track(enumerate(self.reddit_object["comments"][: settings.config["settings"].get("hybrid_comments_count", 1)], start=comment_start_idx), "Processing comments..."):
-                # Stop creating mp3 files if the length is greater than max length
-                if self.length > self.max_length and comment_idx > comment_start_idx:
-                    self.length -= self.last_clip_length
-                    comment_idx -= 1
-                    break
-                if (
-                    len(comment["comment_body"]) > self.tts_module.max_chars
-                ):  # Split the comment if it is too long
-                    self.split_post(comment["comment_body"], f"comment-{comment_idx}")
-                else:  # If the comment is not too long, just call the tts engine
-                    self.call_tts(f"comment-{comment_idx}", process_text(comment["comment_body"]))
-            
-            idx = comment_start_idx + len(self.reddit_object["comments"]) - 1
-            
-        elif settings.config["settings"]["storymode"]:
-            if settings.config["settings"]["storymodemethod"] == 0:
-                if len(self.reddit_object["thread_post"]) > self.tts_module.max_chars:
-                    self.split_post(self.reddit_object["thread_post"], "postaudio")
-                else:
-                    self.call_tts("postaudio", process_text(self.reddit_object["thread_post"]))
-            elif settings.config["settings"]["storymodemethod"] == 1:
-                for idx, text in track(enumerate(self.reddit_object["thread_post"])):
-                    self.call_tts(f"postaudio-{idx}", process_text(text))
-
-        else:
-            for idx, comment in track(enumerate(self.reddit_object["comments"]), "Saving..."):
+        # Every clip becomes a job; the scheduler synthesizes them concurrently and hands the
+        # durations back in this order, so the length cutoff below sees them as before.
+        clips = [("title", self.reddit_object["thread_title"], False)]
+        if hybrid_mode or config["storymode"]:
+            if config["storymodemethod"] == 0:
+                clips.append(("postaudio", self.reddit_object["thread_post"], True))
+            elif config["storymodemethod"] == 1:
+                for idx, text in enumerate(self.reddit_object["thread_post"]):
+                    clips.append((f"postaudio-{idx}", text, False))
+
+        comments = []
+        comment_names = []
+        comment_start_idx = 0
+        if hybrid_mode:
+            # Handle hybrid mode - process both post content and comments
+            comment_start_idx = idx + 1 if config["storymodemethod"] == 1 else 1
+            comments = self.reddit_object["comments"][: config.get("hybrid_comments_count", 1)]
+            comment_names = [
+                f"comment-{i}" for i in range(comment_start_idx, comment_start_idx + len(comments))
+            ]
+        elif not config["storymode"]:
+            comments = self.reddit_object["comments"]
+            comment_names = [f"{i}" for i in range(len(comments))]
+        if comments and self.planner is not None:
+            comments = self._plan_comments(comments, clips)
+            comment_names = comment_names[: len(comments)]
+        post_clips = len(clips)
+        for name, comment in zip(comment_names, comments):
+            clips.append((name, comment["comment_body"], True))
+
+        lang = settings.config["reddit"]["thread"]["post_lang"]
+        if lang:
+            # Translate every string process_text will see in one go, before the jobs start.
+            print_substep("Translating Text...")
+            translate_many(self._clip_texts(clips), lang)
+
+        self.manifest = []
+        discarded = []
+        scheduler_cls = aio.AsyncScheduler if self.use_async else TTSScheduler
+        with scheduler_cls(self.tts_module) as scheduler:
+            results = scheduler.ordered(self._clip_job(*clip) for clip in clips)
+            for name, _, _ in track(clips[:post_clips], "Saving post..."):
+                self._record_clip(name, next(results))
+
+            comment_idx = comment_start_idx
+            for comment_idx in track(
+                range(comment_start_idx, comment_start_idx + len(comments)), "Saving comments..."
+            ):
                 # ! Stop creating mp3 files if the length is greater than max length.
-                if self.length > self.max_length and idx > 1:
+                if self.length > self.max_length and comment_idx > max(comment_start_idx, 1):
                     self.length -= self.last_clip_length
-                    idx -= 1
+                    last_name = comment_names[comment_idx - comment_start_idx - 1]
+                    if not hybrid_mode and self.manifest and self.manifest[-1]["name"] == last_name:
+                        self.manifest.pop()  # the last clip is synthesized but not shown
+                    results.close()
+                    discarded = comment_names[comment_idx - comment_start_idx :]
+                    comment_idx -= 1
                     break
-                if (
-                    len(comment["comment_body"]) > self.tts_module.max_chars
-                ):  # Split the comment if it is too long
-                    self.split_post(comment["comment_body"], idx)  # Split the comment
-                else:  # If the comment is not too long, just call the tts engine
-                    self.call_tts(f"{idx}", process_text(comment["comment_body"]))
+                self._record_clip(comment_names[comment_idx - comment_start_idx], next(results))
+            else:
+                # Every comment fit (the planner usually sees to that): all of them are shown.
+                comment_idx = comment_start_idx + len(comments)
+        # Jobs already running at the cutoff finish during shutdown, so clean up afterwards.
+        self._discard_clips(discarded)
 
+        if hybrid_mode:
+            idx = comment_start_idx + len(self.reddit_object["comments"]) - 1
+        elif not config["storymode"]:
+            idx = comment_idx
+
+        write_manifest(self.path, self.manifest)
+        if self.planner is not None:
+            texts = {name: text for name, text, _ in clips}
+            self.planner.calibrate(
+                (texts[clip["name"]], clip["duration"] - self._padding.get(clip["name"], 0.0))
+                for clip in self.manifest
+                if clip["name"] in texts and clip["name"] not in self._censored
+            )
+        if self.cache is not None:
+            hits, misses = self.cache.hits - cache_counts[0], self.cache.misses - cache_counts[1]
+            print_substep(f"TTS cache: {hits} hits, {misses} misses.")
+        if hasattr(self.tts_module, "report"):
+            # Providers with their own client-side limits describe how the run went.
+            print_substep(self.tts_module.report())
         print_substep("Saved Text to MP3 files successfully.", style="bold green")
         return self.length, idx
 
-    def split_post(self, text: str, idx):
-        split_files = []
-        split_text = [
-            x.group().strip()
-            for x in re.finditer(
-                r" *(((.|\n){0," + str(self.tts_module.max_chars) + "})(\.|.$))", text
+    def _plan_comments(self, comments, clips):
+        """Keeps only the comments expected to fit max_length, before any TTS call is made.
+
+        The kept comments replace the planned ones in reddit_object, so the screenshots
+        and the final video line up with the audio.
+        """
+        budget = self.max_length - sum(self.planner.estimate(text) for _, text, _ in clips)
+        selected = self.planner.select([c["comment_body"] for c in comments], budget) or [0]
+        planned = [comments[i] for i in selected]
+        print_substep(
+            f"Planned {len(planned)} of {len(comments)} comments to fit {self.max_length}s."
+        )
+        self.reddit_object["comments"][: len(comments)] = planned
+        return planned
+
+    def _clip_texts(self, clips):
+        for _, text, splittable in clips:
+            if splittable and len(text) > self.tts_module.max_chars:
+                yield from self._split_text(text)
+            else:
+                yield text
+
+    def _clip_job(self, filename: str, text: str, splittable: bool = False):
+        """Returns the (fn, args) job that synthesizes one clip and returns its duration."""
+        if splittable and len(text) > self.tts_module.max_chars:
+            return self.split_post, (text, filename)  # Split the text if it is too long
+        if self.use_async and not settings.config["settings"]["tts"].get("censor_swear_words"):
+            return self._asynthesize_text, (filename, text)
+        return self._synthesize_text, (filename, text)
+
+    def _synthesize_text(self, filename: str, text: str) -> Optional[float]:
+        return self._synthesize(filename, process_text(text))
+
+    async def _asynthesize_text(self, filename: str, text: str) -> Optional[float]:
+        """_synthesize_text as a coroutine on the TTS loop, for clips that need no splicing."""
+        await self._aprovider_run(process_text(text), self._clip_path(filename))
+        return self._clip_duration(self._clip_path(filename))
+
+    def _record_clip(self, filename: str, duration: Optional[float]):
+        self._add_clip_length(duration)
+        if duration is not None:
+            self.manifest.append(
+                {"name": filename, "path": self._clip_path(filename), "duration": duration}
             )
-        ]
-        self.create_silence_mp3()
 
-        idy = None
+    def _add_clip_length(self, duration: Optional[float]):
+        if duration is None:
+            self.length = 0
+            return
+        self.last_clip_length = duration
+        self.length += duration
+
+    def _discard_clips(self, filenames):
+        # Clips that were synthesized ahead of the cutoff must not end up in the video.
+        for filename in filenames:
+            try:
+                os.remove(self._clip_path(filename))
+            except OSError:
+                pass
+
+    def _clip_path(self, filename: str) -> str:
+        return f"{self.path}/{filename}.{self.clip_format}"
+
+    def _split_text(self, text: str):
+        return split_sentences(text, self.tts_module.max_chars)
+
+    def split_post(self, text: str, idx) -> Optional[float]:
+        split_text = self._split_text(text)
+        silence_duration = settings.config["settings"]["tts"]["silence_duration"]
+
+        parts = []
         for idy, text_cut in enumerate(split_text):
             newtext = process_text(text_cut)
-            # print(f"{idx}-{idy}: {newtext}\n")
-
             if not newtext or newtext.isspace():
                 print("newtext was blank because sanitized split text resulted in none")
                 continue
-            else:
-                self.call_tts(f"{idx}-{idy}.part", newtext)
-                with open(f"{self.path}/list.txt", "w") as f:
-                    for idz in range(0, len(split_text)):
-                        f.write("file " + f"'{idx}-{idz}.part.mp3'" + "\n")
-                    split_files.append(str(f"{self.path}/{idx}-{idy}.part.mp3"))
-                    f.write("file " + f"'silence.mp3'" + "\n")
-
-                os.system(
-                    "ffmpeg -f concat -y -hide_banner -loglevel panic -safe 0 "
-                    + "-i "
-                    + f"{self.path}/list.txt "
-                    + "-c copy "
-                    + f"{self.path}/{idx}.mp3"
-                )
-        try:
-            for i in range(0, len(split_files)):
-                os.unlink(split_files[i])
-        except FileNotFoundError as e:
-            print("File not found: " + e.filename)
-        except OSError:
-            print("OSError")
-
-    def _build_profanity_set(self):
-        tts_cfg = settings.config["settings"]["tts"]
-        custom = tts_cfg.get("censored_words", "")
-        custom_words = {
-            w.strip().lower()
-            for w in str(custom).split(",")
-            if w and w.strip()
-        }
-        return DEFAULT_PROFANITY_WORDS.union(custom_words)
-
-    def _is_profanity_token(self, token: str, profanity_words) -> bool:
-        cleaned = re.sub(r"[^a-zA-Z0-9']", "", token).lower()
-        if not cleaned:
-            return False
-        if cleaned in profanity_words:
-            return True
-        for word in profanity_words:
-            if cleaned.startswith(word) and len(cleaned) <= len(word) + 3:
-                return True
-        return False
-
-    def _make_silence_file(self, filepath: str, duration: float):
-        safe_duration = max(0.12, float(duration))
-        subprocess.run(
-            [
-                "ffmpeg",
-                "-y",
-                "-f",
-                "lavfi",
-                "-i",
-                "anullsrc=r=44100:cl=mono",
-                "-t",
-                f"{safe_duration:.3f}",
-                "-q:a",
-                "9",
-                "-acodec",
-                "libmp3lame",
-                filepath,
-            ],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+            parts.append((f"{idx}-{idy}.part", newtext))
+        if not parts:
+            return 0
+
+        # Synthesize every chunk first (the provider semaphore caps how many run at once),
+        # then assemble the {idx} clip in a single pass.
+        censor = settings.config["settings"]["tts"].get("censor_swear_words", False)
+        split_files = [self._clip_path(name) for name, _ in parts]
+        if hasattr(self.tts_module, "run_batch") and not censor and not self.use_async:
+            # The provider pipelines the chunks itself; on the TTS loop they all run at once.
+            self._provider_run_batch([(text, path) for (_, text), path in zip(parts, split_files)])
+            durations = [self._clip_duration(path) for path in split_files]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=max(1, int(getattr(self.tts_module, "max_concurrency", 1)))
+            ) as executor:
+                durations = list(executor.map(lambda part: self._synthesize(*part), parts))
+
+        if any(name in self._censored for name, _ in parts):
+            self._censored.add(str(idx))
+        self._padding[str(idx)] = silence_duration
+
+        temp_files = list(split_files)
+        if self.clip_format == "wav":
+            # WAV chunks may differ in rate and layout; splice them as PCM, which is lossless.
+            samples = decode_pcm([p for p in split_files if os.path.exists(p)], PCM_SAMPLE_RATE)
+            samples.append(silence_samples(silence_duration, PCM_SAMPLE_RATE))
+            write_wav(np.concatenate(samples), self._clip_path(idx), PCM_SAMPLE_RATE)
+        else:
+            # Stream copy can't resample: the gap must have the chunks' own rate and layout.
+            sample_rate, channels = next(
+                filter(None, map(get_format, split_files)), (PCM_SAMPLE_RATE, 1)
+            )
+            silence = silence_file(silence_duration, sample_rate, channels, fmt=self.clip_format)
+            list_file = f"{self.path}/{idx}.list.txt"
+            temp_files.append(list_file)
+            with open(list_file, "w", encoding="utf-8") as f:
+                for path in split_files:
+                    f.write(f"file '{os.path.basename(path)}'\n")
+                f.write(f"file '{Path(silence).as_posix()}'\n")
+            subprocess.run(
+                [
+                    "ffmpeg",
+                    "-f",
+                    "concat",
+                    "-y",
+                    "-hide_banner",
+                    "-loglevel",
+                    "panic",
+                    "-safe",
+                    "0",
+                    "-i",
+                    list_file,
+                    "-c",
+                    "copy",
+                    self._clip_path(idx),
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+
+        for path in temp_files:
+            try:
+                os.unlink(path)
+            except FileNotFoundError as e:
+                print("File not found: " + e.filename)
+            except OSError:
+                print("OSError")
+
+        if any(duration is None for duration in durations):
+            return None
+        return self._clip_duration(self._clip_path(idx))
+
+    def _is_profanity_token(self, token: str, matcher: Pattern) -> bool:
+        cleaned = _NON_WORD_CHARS.sub("", token).lower()
+        return bool(cleaned) and matcher.fullmatch(cleaned) is not None
 
     def _call_tts_with_profanity_silence(self, filename: str, text: str):
         tts_cfg = settings.config["settings"]["tts"]
-        profanity_words = self._build_profanity_set()
+        matcher = profanity_matcher(str(tts_cfg.get("censored_words", "")))
         base_word_silence = float(tts_cfg.get("censor_word_silence_sec", 0.35))
         per_char_silence = float(tts_cfg.get("censor_char_silence_sec", 0.02))
 
-        tokens = re.split(r"(\s+)", text)
+        tokens = _WHITESPACE_SPLIT.split(text)
         parts = []
         current_speech = []
 
         for token in tokens:
             if token == "":
                 continue
-            if self._is_profanity_token(token, profanity_words):
+            if self._is_profanity_token(token, matcher):
                 if current_speech:
                     parts.append(("speech", "".join(current_speech)))
                     current_speech = []
-                cleaned = re.sub(r"[^a-zA-Z0-9']", "", token)
+                cleaned = _NON_WORD_CHARS.sub("", token)
                 duration = base_word_silence + len(cleaned) * per_char_silence
-                parts.append(("silence", duration))
+                parts.append(("silence", max(0.12, duration)))
             else:
                 current_speech.append(token)
 
         if current_speech:
             parts.append(("speech", "".join(current_speech)))
 
-        if not parts:
-            self.tts_module.run(
-                text,
-                filepath=f"{self.path}/{filename}.mp3",
-                random_voice=tts_cfg["random_voice"],
+        # Whitespace between two censored words has nothing to say.
+        parts = [(kind, payload) for kind, payload in parts if kind == "silence" or payload.strip()]
+        if any(kind == "silence" for kind, _ in parts):
+            self._censored.add(str(filename))
+
+        # Even a clip with nothing censored goes through the splice below: the provider writes
+        # its own format, and the clip has to be a real WAV.
+        speech = [
+            (
+                part_idx,
+                payload.strip(),
+                f"{self.path}/{filename}.part{part_idx}.{self.provider_format}",
+            )
+            for part_idx, (kind, payload) in enumerate(parts)
+            if kind == "speech"
+        ]
+        with ThreadPoolExecutor(
+            max_workers=max(1, int(getattr(self.tts_module, "max_concurrency", 1)))
+        ) as executor:
+            list(executor.map(lambda part: self._provider_run(part[1], part[2]), speech))
+
+        # Splice speech and silence as PCM in memory: one decode for all speech, one encode.
+        decoded = dict(
+            zip(
+                [part_idx for part_idx, _, _ in speech],
+                decode_pcm([path for _, _, path in speech], PCM_SAMPLE_RATE),
             )
-            return
-
-        part_files = []
-        part_idx = 0
-        for kind, payload in parts:
-            part_path = f"{self.path}/{filename}.part{part_idx}.mp3"
-            if kind == "speech":
-                speech_text = str(payload).strip()
-                if not speech_text:
-                    continue
-                self.tts_module.run(
-                    speech_text,
-                    filepath=part_path,
-                    random_voice=tts_cfg["random_voice"],
-                )
-            else:
-                self._make_silence_file(part_path, float(payload))
-            part_files.append(part_path)
-            part_idx += 1
-
-        if not part_files:
-            self._make_silence_file(f"{self.path}/{filename}.mp3", base_word_silence)
-            return
-
-        if len(part_files) == 1:
-            os.replace(part_files[0], f"{self.path}/{filename}.mp3")
-            return
-
-        list_file = f"{self.path}/{filename}.parts.txt"
-        out_file = os.path.abspath(f"{self.path}/{filename}.mp3").replace("\\", "/")
-        with open(list_file, "w", encoding="utf-8") as f:
-            for p in part_files:
-                normalized = os.path.abspath(p).replace("\\", "/").replace("'", "\\'")
-                f.write(f"file '{normalized}'\n")
-
-        subprocess.run(
-            [
-                "ffmpeg",
-                "-y",
-                "-f",
-                "concat",
-                "-safe",
-                "0",
-                "-i",
-                list_file,
-                "-c:a",
-                "libmp3lame",
-                "-q:a",
-                "4",
-                out_file,
-            ],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            text=True,
         )
+        samples = [
+            decoded[part_idx] if kind == "speech" else silence_samples(payload, PCM_SAMPLE_RATE)
+            for part_idx, (kind, payload) in enumerate(parts)
+        ]
+        if not samples:
+            samples = [silence_samples(base_word_silence, PCM_SAMPLE_RATE)]
+        write_wav(np.concatenate(samples), self._clip_path(filename), PCM_SAMPLE_RATE)
 
-        for p in part_files:
+        for _, _, path in speech:
             try:
-                os.remove(p)
+                os.remove(path)
             except OSError:
                 pass
-        try:
-            os.remove(list_file)
-        except OSError:
-            pass
 
     def call_tts(self, filename: str, text: str):
+        self._add_clip_length(self._synthesize(filename, text))
+
+    def _synthesize(self, filename: str, text: str) -> Optional[float]:
+        """Writes the {filename} clip and returns its duration, or None if it can't be read.
+
+        Safe to call from several scheduler threads at once; it doesn't touch self.length.
+        """
         tts_cfg = settings.config["settings"]["tts"]
         censor_enabled = bool(tts_cfg.get("censor_swear_words", False))
 
         if censor_enabled:
             self._call_tts_with_profanity_silence(filename, text)
         else:
-            self.tts_module.run(
-                text,
-                filepath=f"{self.path}/{filename}.mp3",
-                random_voice=tts_cfg["random_voice"],
-            )
+            self._provider_run(text, self._clip_path(filename))
 
+        return self._clip_duration(self._clip_path(filename))
+
+    @staticmethod
+    def _clip_duration(filepath: str) -> Optional[float]:
+        duration = get_duration(filepath)
+        if duration is not None:
+            return duration
+        # Not an MP3/WAV we can read the headers of; let moviepy decode it. Imported here
+        # because moviepy is slow to import and this is rarely needed.
         try:
-            clip = AudioFileClip(f"{self.path}/{filename}.mp3")
-            self.last_clip_length = clip.duration
-            self.length += clip.duration
+            try:
+                from moviepy.editor import AudioFileClip
+            except ModuleNotFoundError:
+                from moviepy import AudioFileClip
+
+            clip = AudioFileClip(filepath)
+            duration = clip.duration
             clip.close()
+            return duration
         except:
-            self.length = 0
-
-    def create_silence_mp3(self):
-        silence_duration = settings.config["settings"]["tts"]["silence_duration"]
-        silence = AudioClip(
-            make_frame=lambda t: np.sin(440 * 2 * np.pi * t),
-            duration=silence_duration,
-            fps=44100,
+            return None
+
+    def _cache_key(self, text: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.key(
+            type(self.tts_module).__name__,
+            voice_for(self.tts_module, settings.config["settings"]["tts"]["random_voice"]),
+            settings.config["reddit"]["thread"]["post_lang"] or "en",
+            text,
+            params_for(self.tts_module),
         )
-        if volumex is not None:
-            silence = volumex(silence, 0)
-        else:
-            try:
-                silence = silence.with_volume_scaled(0)
-            except AttributeError:
-                pass
-        try:
-            silence.write_audiofile(f"{self.path}/silence.mp3", fps=44100, verbose=False, logger=None)
-        except TypeError:
-            silence.write_audiofile(f"{self.path}/silence.mp3", fps=44100, logger=None)
+
+    def _provider_run(self, text: str, filepath: str):
+        if self.use_async:
+            # Called from a worker thread (split_post, the censor path); the request itself
+            # still goes through the TTS loop.
+            aio.run_async(self._aprovider_run(text, filepath))
+            return
+        random_voice = settings.config["settings"]["tts"]["random_voice"]
+        key, hit = self._fetch_cached(text, filepath)
+        if hit:
+            return
+
+        with provider_slots(self.tts_module):
+            self.tts_module.run(text, filepath=filepath, random_voice=random_voice)
+
+        self._store_cached(key, filepath)
+
+    async def _aprovider_run(self, text: str, filepath: str):
+        """Like _provider_run, through the provider's arun on the TTS loop."""
+        random_voice = settings.config["settings"]["tts"]["random_voice"]
+        key, hit = self._fetch_cached(text, filepath)
+        if hit:
+            return
+
+        async with aio.provider_slots(self.tts_module):
+            await self.tts_module.arun(text, filepath=filepath, random_voice=random_voice)
+
+        self._store_cached(key, filepath)
+
+    def _provider_run_batch(self, jobs):
+        """Like _provider_run for several (text, filepath) jobs, through the provider's run_batch."""
+        random_voice = settings.config["settings"]["tts"]["random_voice"]
+        pending = []
+        for text, filepath in jobs:
+            key, hit = self._fetch_cached(text, filepath)
+            if not hit:
+                pending.append((text, filepath, key))
+        if not pending:
+            return
+
+        with held_slots(self.tts_module) as slots:
+            self.tts_module.run_batch(
+                [(text, filepath) for text, filepath, _ in pending],
+                random_voice=random_voice,
+                max_workers=slots,
+            )
+
+        for _, filepath, key in pending:
+            self._store_cached(key, filepath)
+
+    def _fetch_cached(self, text: str, filepath: str) -> Tuple[Optional[str], bool]:
+        """Puts the cached clip for text at filepath. Returns its cache key and whether it hit."""
+        key = self._cache_key(text)
+        if key is not None and self.cache.fetch(key, filepath):
+            return key, True
+        _discard(filepath)
+        return key, False
+
+    def _store_cached(self, key: Optional[str], filepath: str):
+        if not is_degraded(self.tts_module, filepath) and key is not None:
+            self.cache.store(key, filepath)
+
+
+def _discard(filepath: str):
+    """Removes a clip left by an earlier run before the provider writes a new one.
+
+    Cache hits are copies (TTSCache.fetch), so this never touches the cache itself; it only
+    makes sure a provider that fails without writing anything doesn't leave the old clip
+    behind to be taken for its output.
+    """
+    try:
+        os.unlink(filepath)
+    except FileNotFoundError:
+        pass
 
 
 def process_text(text: str, clean: bool = True):
@@ -390,6 +569,5 @@ def process_text(text: str, clean: bool = True):
     new_text = sanitize_text(text) if clean else text
     if lang:
         print_substep("Translating Text...")
-        translated_text = translators.translate_text(text, translator="google", to_language=lang)
-        new_text = sanitize_text(translated_text)
+        new_text = sanitize_text(translate(text, lang))
     return new_text
@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from utils.voice import sanitize_text
+
+DEFAULT_RATES_PATH: str = "assets/tts_rates.json"
+# Spoken characters per second for a voice we have never measured.
+DEFAULT_CHARS_PER_SECOND: float = 15.0
+# Weight of the newest run in the moving average of a voice's speaking rate.
+RATE_SMOOTHING: float = 0.3
+
+_lock = threading.Lock()
+
+
+def spoken_chars(text: str) -> int:
+    return len(sanitize_text(str(text)))
+
+
+class BudgetPlanner:
+    """Estimates spoken durations from text and picks the comments that fit a length budget.
+
+    Args:
+        rate_key (str): Provider and voice the rate is kept for, e.g. "TikTok:en_us_001".
+        path (Optional) : JSON file the calibrated rates are kept in between runs.
+
+    Notes:
+        The estimate only decides what gets synthesized. TTSEngine.run still measures every
+        clip and stops at max_length, so a bad estimate costs a clip, never an overlong video.
+    """
+
+    def __init__(self, rate_key: str, path: str = DEFAULT_RATES_PATH):
+        self.rate_key = rate_key
+        self.path = path
+        rate = self._load().get(rate_key, {})
+        self.chars_per_second = float(rate.get("chars_per_second", DEFAULT_CHARS_PER_SECOND))
+
+    def estimate(self, text: str) -> float:
+        return spoken_chars(text) / self.chars_per_second
+
+    def select(self, texts: List[str], budget: float) -> List[int]:
+        """Returns the indices of the texts to synthesize, in their original order.
+
+        Texts are taken in rank order; one that would overflow the budget is skipped so a
+        shorter one further down can still fill the gap.
+        """
+        selected = []
+        for idx, text in enumerate(texts):
+            duration = self.estimate(text)
+            if duration <= budget:
+                selected.append(idx)
+                budget -= duration
+        return selected
+
+    def calibrate(self, samples: Iterable[Tuple[str, float]]):
+        """Folds the measured (text, duration) pairs of a run into the voice's speaking rate."""
+        chars, seconds = 0, 0.0
+        for text, duration in samples:
+            if duration > 0:
+                chars += spoken_chars(text)
+                seconds += duration
+        if not chars or seconds <= 0:
+            return
+        measured = chars / seconds
+        with _lock:
+            rates = self._load()
+            previous = rates.get(self.rate_key)
+            if previous:
+                old = float(previous["chars_per_second"])
+                measured = old + RATE_SMOOTHING * (measured - old)
+            rates[self.rate_key] = {
+                "chars_per_second": measured,
+                "runs": int(previous["runs"]) + 1 if previous else 1,
+            }
+            self._save(rates)
+        self.chars_per_second = measured
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, rates: Dict[str, Dict]):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(rates, f, indent=4)
+            os.replace(tmp, self.path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
@@ -1,14 +1,94 @@
+import atexit
+import multiprocessing
 import random
+import threading
+from concurrent.futures import Future
+from typing import List, Tuple
 
 import pyttsx3
 
 from utils import settings
 
 
+def _serve(conn):
+    """Worker process: one pyttsx3 engine for its whole life, one runAndWait per batch."""
+    engine = pyttsx3.init()
+    voices = engine.getProperty("voices")
+    conn.send(("ready", len(voices)))
+    while True:
+        try:
+            batch = conn.recv()
+        except EOFError:
+            return
+        if batch is None:
+            return
+        try:
+            for text, filepath, voice_id in batch:
+                # setProperty is queued like save_to_file, so every clip gets its own voice
+                engine.setProperty("voice", voices[voice_id].id)
+                engine.save_to_file(text, filepath)
+            engine.runAndWait()
+            conn.send(("ok", None))
+        except Exception as e:
+            conn.send(("error", repr(e)))
+
+
+class _EngineWorker:
+    """Owns the long-lived pyttsx3 worker process and restarts it if it dies."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._process = None
+        self._conn = None
+        self.voice_count = 0
+
+    def _start(self):
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(target=_serve, args=(child_conn,), daemon=True)
+        self._process.start()
+        child_conn.close()
+        _, self.voice_count = self._conn.recv()
+
+    def synthesize(self, batch: List[Tuple[str, str, int]]):
+        with self._lock:
+            if self._process is None or not self._process.is_alive():
+                self._start()
+            try:
+                self._conn.send(batch)
+                status, error = self._conn.recv()
+            except (EOFError, OSError):
+                self._process = None
+                raise RuntimeError("The pyttsx3 worker process exited unexpectedly")
+        if status != "ok":
+            raise RuntimeError(f"pyttsx3 failed to synthesize: {error}")
+
+    def close(self):
+        with self._lock:
+            if self._process is not None and self._process.is_alive():
+                try:
+                    self._conn.send(None)
+                except OSError:
+                    pass
+                self._process.join(timeout=5)
+            self._process = None
+
+
+_worker = _EngineWorker()
+atexit.register(_worker.close)
+
+
 class pyttsx:
     def __init__(self):
         self.max_chars = 5000
+        # pyttsx3 saves uncompressed WAV whatever the file is called.
+        self.audio_format = "wav"
+        # Calls only queue their clips; they reach the single engine process in batches.
+        self.max_concurrency = 8
         self.voices = []
+        self._lock = threading.Lock()
+        self._queue = []
+        self._sending = False
 
     def run(
         self,
@@ -16,6 +96,15 @@ class pyttsx:
         filepath: str,
         random_voice=False,
     ):
+        self.run_batch([(text, filepath)], random_voice)
+
+    def run_batch(self, jobs: List[Tuple[str, str]], random_voice=False, max_workers=None):
+        """Synthesizes several (text, filepath) jobs with a single runAndWait.
+
+        Jobs queued by other threads while a batch is being spoken go out together in the
+        next batch, so a thread's clips cost a few engine runs instead of one each. The
+        single engine process speaks them one after another, so max_workers is not used.
+        """
         voice_id = settings.config["settings"]["tts"]["python_voice"]
         voice_num = settings.config["settings"]["tts"]["py_voice_num"]
         if voice_id == "" or voice_num == "":
@@ -25,18 +114,38 @@ class pyttsx:
         else:
             voice_id = int(voice_id)
             voice_num = int(voice_num)
-        for i in range(voice_num):
-            self.voices.append(i)
-            i = +1
-        if random_voice:
-            voice_id = self.randomvoice()
-        engine = pyttsx3.init()
-        voices = engine.getProperty("voices")
-        engine.setProperty(
-            "voice", voices[voice_id].id
-        )  # changing index changes voices but ony 0 and 1 are working here
-        engine.save_to_file(text, f"{filepath}")
-        engine.runAndWait()
+        self.voices = list(range(voice_num))
+
+        pending = []
+        with self._lock:
+            for text, filepath in jobs:
+                done = Future()
+                voice = self.randomvoice() if random_voice else voice_id
+                self._queue.append((text, str(filepath), voice, done))
+                pending.append(done)
+            leader = not self._sending
+            self._sending = True
+        if leader:
+            self._send_batches()
+        for done in pending:
+            done.result()
+
+    def _send_batches(self):
+        while True:
+            with self._lock:
+                batch, self._queue = self._queue, []
+                if not batch:
+                    self._sending = False
+                    return
+            try:
+                # changing index changes voices but ony 0 and 1 are working here
+                _worker.synthesize([(text, filepath, voice) for text, filepath, voice, _ in batch])
+            except Exception as e:
+                for *_, done in batch:
+                    done.set_exception(e)
+            else:
+                for *_, done in batch:
+                    done.set_result(None)
 
     def randomvoice(self):
         return random.choice(self.voices)
@@ -1,14 +1,188 @@
+import base64
+import itertools
 import json
+import math
 import os
 import re
 import subprocess
 import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
 
+import numpy as np
+
+from utils.audio import decode_pcm, encode_pcm, silence_samples, write_wav
+from utils.voice import split_sentences
+
+# Qwen3-TTS generates 24 kHz mono audio.
+SAMPLE_RATE = 24000
+
+# (device, dtype, max_new_tokens, timeout_sec), tried in order until one works. A worker that
+# goes timeout_sec without replying to anything is taken to be hung.
+ATTEMPTS = (
+    ("cuda:0", "bfloat16", 220, 420),
+    ("cuda:0", "float16", 180, 360),
+    ("cpu", "float32", 180, 420),
+)
+# Seconds a failed (device, dtype) is skipped before one chunk is let through to retry it.
+DEVICE_RETRY_SEC = float(os.getenv("QWEN3_DEVICE_RETRY_SEC", "300"))
+
+
+def _resample(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Linearly resamples mono int16 PCM to SAMPLE_RATE. A no-op for 24 kHz input."""
+    if sample_rate == SAMPLE_RATE or not len(samples):
+        return samples
+    n = int(round(len(samples) * SAMPLE_RATE / sample_rate))
+    positions = np.linspace(0, len(samples) - 1, n)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+
+
+class _DeviceBreaker:
+    """Remembers which (device, dtype) attempts are failing, for the rest of the process.
+
+    A failing attempt is skipped until its retry time. After that a single chunk is let
+    through to try it (half-open) while the others keep skipping it; success closes it again.
+    """
+
+    def __init__(self, retry_sec: float):
+        self.retry_sec = retry_sec
+        self._lock = threading.Lock()
+        self._retry_at = {}
+        self._probing = set()
+
+    def allow(self, key) -> bool:
+        with self._lock:
+            retry_at = self._retry_at.get(key)
+            if retry_at is None:
+                return True
+            if key in self._probing or time.monotonic() < retry_at:
+                return False
+            self._probing.add(key)
+            return True
+
+    def record(self, key, ok):
+        """ok is True/False for a working/broken attempt, None if the outcome says nothing
+        about the device (e.g. the model rejected this text)."""
+        with self._lock:
+            self._probing.discard(key)
+            if ok:
+                self._retry_at.pop(key, None)
+            elif ok is not None:
+                self._retry_at[key] = time.monotonic() + self.retry_sec
+
+
+_breaker = _DeviceBreaker(DEVICE_RETRY_SEC)
+
+
+class _QwenWorker:
+    """One persistent qwen3_worker.py process.
+
+    Requests carry an ID that the worker echoes back, so several can be written before the
+    first reply arrives; a reader thread hands each reply to the Future of its request.
+    """
+
+    def __init__(self, cmd: list, env: dict):
+        self._pending = {}
+        # When the worker last answered, or picked up work after being idle.
+        self.last_reply = time.monotonic()
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self.proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            env=env,
+        )
+        ready = self.proc.stdout.readline().strip() if self.proc.stdout else ""
+        try:
+            payload = json.loads(ready) if ready else {}
+        except Exception:
+            payload = {}
+        self.ready = bool(payload.get("ready"))
+        if not self.ready:
+            self.kill()
+            return
+        threading.Thread(target=self._read_replies, daemon=True).start()
+
+    @property
+    def alive(self) -> bool:
+        return self.ready and self.proc.poll() is None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def submit(self, request: dict) -> Future:
+        done = Future()
+        with self._lock:
+            request_id = next(self._ids)
+            if not self._pending:
+                self.last_reply = time.monotonic()
+            self._pending[request_id] = done
+            try:
+                self.proc.stdin.write(json.dumps({**request, "id": request_id}) + "\n")
+                self.proc.stdin.flush()
+            except (OSError, ValueError) as e:
+                del self._pending[request_id]
+                done.set_exception(e)
+        return done
+
+    def _read_replies(self):
+        for line in self.proc.stdout:
+            try:
+                payload = json.loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                self.last_reply = time.monotonic()
+                done = self._pending.pop(payload.get("id"), None)
+            if done is not None:
+                done.set_result(payload)
+        # The process is gone; nothing still in flight will be answered.
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for done in pending.values():
+            done.set_exception(RuntimeError("qwen3 worker exited"))
+
+    def wait(self, done: Future, timeout: float) -> dict:
+        """Returns the reply of a submitted request.
+
+        The worker answers its requests one after another, so it is only considered hung
+        once it has gone timeout seconds without any reply, however many requests are
+        queued ahead of this one.
+
+        Raises:
+            FutureTimeoutError: The worker stopped answering.
+        """
+        while not done.done():
+            remaining = timeout - (time.monotonic() - self.last_reply)
+            if remaining <= 0:
+                raise FutureTimeoutError()
+            try:
+                return done.result(timeout=remaining)
+            except FutureTimeoutError:
+                continue
+        return done.result()
+
+    def kill(self):
+        try:
+            self.proc.kill()
+        except Exception:
+            pass
+
 
 class Qwen3Clone:
     def __init__(self):
         self.max_chars = 5000
+        # The model's PCM is written as is; TTSEngine names the clips .wav.
+        self.audio_format = "wav"
         self.ref_audio = os.getenv(
             "QWEN3_REF_AUDIO",
             r"C:\Users\tarus\.openclaw\workspace\voice_samples\tarushv_ref_16k.wav",
@@ -34,7 +208,37 @@ class Qwen3Clone:
         self.wsl_distro = os.getenv("QWEN3_WSL_DISTRO", "Ubuntu-24.04")
         self.wsl_python = os.getenv("QWEN3_WSL_PYTHON", "/home/tarushv/.venvs/rhm/bin/python")
         self.worker_script = str(Path(__file__).with_name("qwen3_worker.py"))
+        # Worker processes per (device, dtype). Every GPU worker holds its own copy of the
+        # model, so only CPU pools default to more than one.
+        self.gpu_workers = max(1, int(os.getenv("QWEN3_WORKERS", "1")))
+        self.cpu_workers = max(
+            1, int(os.getenv("QWEN3_CPU_WORKERS", str(max(1, (os.cpu_count() or 1) // 4))))
+        )
+        # Chunks generated together in one forward pass by a worker.
+        self.batch_size = max(1, int(os.getenv("QWEN3_BATCH_SIZE", "4")))
+        self.max_concurrency = self.gpu_workers
         self._workers = {}
+        self._workers_lock = threading.Lock()
+        # Clips written with stand-in silence for chunks that failed on every attempt.
+        self._degraded = set()
+        self._degraded_lock = threading.Lock()
+
+    def cache_params(self) -> str:
+        # The voice is the reference clip; re-recording it or editing its transcript in place
+        # changes the audio without changing either path.
+        params = []
+        for path in (self.ref_audio, self.ref_text_file):
+            try:
+                stat = os.stat(path)
+                params.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+            except OSError:
+                params.append(path)
+        return "|".join(params)
+
+    def degraded(self, filepath: str) -> bool:
+        """Whether the clip last written at filepath has stand-in silence for failed chunks."""
+        with self._degraded_lock:
+            return str(Path(filepath)) in self._degraded
 
     def _prepare_text(self, text: str) -> str:
         # Keep script fidelity as close to original pipeline as possible.
@@ -43,50 +247,7 @@ class Qwen3Clone:
 
     def _split_sentences(self, text: str, max_chunk_chars: int = 900):
         # Split for generation stability, but NEVER truncate content.
-        parts = re.split(r"(?<=[\.!?])\s+", text)
-        parts = [p.strip() for p in parts if p and p.strip()]
-
-        if not parts:
-            parts = [text]
-
-        chunks = []
-        current = ""
-        for part in parts:
-            # If this sentence is huge, split by words while preserving all text.
-            if len(part) > max_chunk_chars:
-                words = part.split()
-                seg = ""
-                for w in words:
-                    nxt = (seg + " " + w).strip()
-                    if len(nxt) <= max_chunk_chars:
-                        seg = nxt
-                    else:
-                        if seg:
-                            chunks.append(seg)
-                        seg = w
-                if seg:
-                    if current:
-                        if len((current + " " + seg).strip()) <= max_chunk_chars:
-                            current = (current + " " + seg).strip()
-                        else:
-                            chunks.append(current)
-                            current = seg
-                    else:
-                        current = seg
-                continue
-
-            candidate = (current + " " + part).strip() if current else part
-            if len(candidate) <= max_chunk_chars:
-                current = candidate
-            else:
-                if current:
-                    chunks.append(current)
-                current = part
-
-        if current:
-            chunks.append(current)
-
-        return chunks
+        return split_sentences(text, max_chunk_chars) or [text]
 
     def _to_wsl_path(self, p: str) -> str:
         p = str(p).replace('\\', '/')
@@ -134,12 +295,10 @@ class Qwen3Clone:
             out_wav,
         ]
 
-    def _start_wsl_worker(self, device: str, dtype: str, env: dict):
-        key = (device, dtype)
-        proc = self._workers.get(key)
-        if proc and proc.poll() is None:
-            return proc
+    def _pool_size(self, device: str) -> int:
+        return self.cpu_workers if device == "cpu" else self.gpu_workers
 
+    def _worker_cmd(self, device: str, dtype: str) -> list:
         cmd = [
             "wsl.exe",
             "-d",
@@ -158,74 +317,131 @@ class Qwen3Clone:
             "--ref-text-file",
             self._to_wsl_path(self.ref_text_file),
         ]
-        proc = subprocess.Popen(
-            cmd,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            text=True,
-            bufsize=1,
-            env=env,
-        )
-
-        ready = proc.stdout.readline().strip() if proc.stdout else ""
-        try:
-            payload = json.loads(ready) if ready else {}
-        except Exception:
-            payload = {}
-        if not payload.get("ready"):
-            try:
-                proc.kill()
-            except Exception:
-                pass
-            return None
+        if device == "cpu":
+            # Split the cores between the workers instead of letting each one claim all.
+            threads = max(1, (os.cpu_count() or 1) // self._pool_size(device))
+            cmd += ["--threads", str(threads)]
+        return cmd
 
-        self._workers[key] = proc
-        return proc
+    def _worker_pool(self, device: str, dtype: str, env: dict):
+        """Returns the live workers for (device, dtype), starting any that are missing."""
+        key = (device, dtype)
+        with self._workers_lock:
+            workers = [w for w in self._workers.get(key, []) if w.alive]
+            missing = self._pool_size(device) - len(workers)
+            if missing > 0:
+                # Model loading dominates start-up, so start the workers side by side.
+                with ThreadPoolExecutor(max_workers=missing) as executor:
+                    started = list(
+                        executor.map(
+                            lambda _: _QwenWorker(self._worker_cmd(device, dtype), env),
+                            range(missing),
+                        )
+                    )
+                workers += [w for w in started if w.ready]
+            self._workers[key] = workers
+            return workers
 
-    def _run_wsl_worker_request(self, proc, text: str, out_wav: str, max_tokens: int):
-        if not proc or proc.poll() is not None or not proc.stdin or not proc.stdout:
-            return False
+    def _run_worker_request(
+        self,
+        device: str,
+        dtype: str,
+        env: dict,
+        texts: list,
+        max_tokens: int,
+        timeout_sec: int,
+    ):
+        """Returns one int16 PCM array per text, or None if the worker didn't deliver."""
+        key = (device, dtype)
+        workers = self._worker_pool(device, dtype, env)
+        if not workers:
+            _breaker.record(key, False)  # the model doesn't load here
+            return None
+        worker = min(workers, key=lambda w: w.in_flight)
         req = {
-            "text": text,
-            "out": self._to_wsl_path(out_wav),
+            "texts": texts,
+            "pcm": True,
             "language": "English",
             "max_new_tokens": int(max_tokens),
         }
-        proc.stdin.write(json.dumps(req) + "\n")
-        proc.stdin.flush()
-        resp = proc.stdout.readline().strip()
         try:
-            payload = json.loads(resp) if resp else {}
+            payload = worker.wait(worker.submit(req), timeout_sec)
+        except FutureTimeoutError:
+            worker.kill()  # a hung model; the pool starts a fresh worker on the next request
+            _breaker.record(key, False)
+            return None
         except Exception:
-            payload = {}
-        return bool(payload.get("ok"))
-
-    def _write_silence_wav(self, wav_path: Path, duration_sec: float = 0.4):
-        subprocess.run(
-            [
-                self.ffmpeg_bin,
-                "-y",
-                "-f",
-                "lavfi",
-                "-i",
-                "anullsrc=r=24000:cl=mono",
-                "-t",
-                f"{max(0.12, float(duration_sec)):.3f}",
-                "-ac",
-                "1",
-                "-ar",
-                "24000",
-                str(wav_path),
-            ],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+            _breaker.record(key, False)
+            return None
+        if not payload.get("ok") or len(payload.get("pcm") or ()) != len(texts):
+            _breaker.record(key, None)
+            return None
+        _breaker.record(key, True)
+        sr = int(payload.get("sr", SAMPLE_RATE))
+        return [
+            _resample(np.frombuffer(base64.b64decode(pcm), dtype="<i2"), sr)
+            for pcm in payload["pcm"]
+        ]
+
+    def _read_wav(self, wav_path: Path) -> np.ndarray:
+        with wave.open(str(wav_path), "rb") as f:
+            if f.getsampwidth() == 2 and f.getnchannels() == 1:
+                frames = f.readframes(f.getnframes())
+                return _resample(np.frombuffer(frames, dtype="<i2"), f.getframerate())
+        return decode_pcm([str(wav_path)], SAMPLE_RATE)[0].reshape(-1)
+
+    def _synthesize_batch(self, chunks: list, tmp_wavs: list, env: dict) -> list:
+        """Returns one int16 PCM array at SAMPLE_RATE per chunk, None for a failed chunk."""
+        # Attempts that keep failing are skipped, so on a CPU-only box the chunks go straight
+        # to the CPU. If everything is failing, the last resort is still tried.
+        tried = False
+        for i, (device, dtype, max_tokens, timeout_sec) in enumerate(ATTEMPTS):
+            last_resort = not tried and i == len(ATTEMPTS) - 1
+            if not last_resort and not _breaker.allow((device, dtype)):
+                continue
+            tried = True
+            if self.use_wsl:
+                pcm = self._run_worker_request(device, dtype, env, chunks, max_tokens, timeout_sec)
+                if pcm is not None:
+                    return pcm
+            elif len(chunks) == 1:
+                base_cmd = self._build_base_cmd(chunks[0], str(tmp_wavs[0]), max_tokens)
+                try:
+                    subprocess.run(
+                        base_cmd + ["--device", device, "--dtype", dtype],
+                        check=True,
+                        env=env,
+                        timeout=timeout_sec,
+                    )
+                except Exception:
+                    _breaker.record((device, dtype), False)
+                    continue
+                _breaker.record((device, dtype), True)
+                return [self._read_wav(tmp_wavs[0])]
+
+        if len(chunks) > 1:
+            # One bad chunk shouldn't cost its neighbours; retry them on their own.
+            return [
+                self._synthesize_batch([chunk], [tmp_wav], env)[0]
+                for chunk, tmp_wav in zip(chunks, tmp_wavs)
+            ]
+
+        return [None]
+
+    def _batches(self, chunks: list, wav_paths: list) -> list:
+        """Groups consecutive chunks into worker batches of at most batch_size.
+
+        Batches are kept small enough that every GPU worker still gets one.
+        """
+        if not self.use_wsl:
+            # The one-shot script only takes a single text.
+            return [([c], [p]) for c, p in zip(chunks, wav_paths)]
+        size = min(self.batch_size, max(1, math.ceil(len(chunks) / self.gpu_workers)))
+        return [(chunks[i : i + size], wav_paths[i : i + size]) for i in range(0, len(chunks), size)]
 
     def run(self, text: str, filepath: str, random_voice: bool = False):
-        out_mp3 = Path(filepath)
-        out_mp3.parent.mkdir(parents=True, exist_ok=True)
+        out_path = Path(filepath)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
 
         text = self._prepare_text(text)
         if len(text) < 2:
@@ -239,87 +455,38 @@ class Qwen3Clone:
 
         with tempfile.TemporaryDirectory() as td:
             tmp_dir = Path(td)
-            wav_paths = []
-
-            for i, chunk in enumerate(chunks):
-                tmp_wav = tmp_dir / f"part_{i:02d}.wav"
-
-                attempts = [
-                    ("cuda:0", "bfloat16", 220, 420),
-                    ("cuda:0", "float16", 180, 360),
-                    ("cpu", "float32", 180, 420),
-                ]
-
-                success = False
-                for device, dtype, max_tokens, timeout_sec in attempts:
-                    if self.use_wsl:
-                        proc = self._start_wsl_worker(device, dtype, env)
-                        try:
-                            if proc and self._run_wsl_worker_request(proc, chunk, str(tmp_wav), max_tokens):
-                                success = True
-                                break
-                        except Exception:
-                            pass
-                    else:
-                        base_cmd = self._build_base_cmd(chunk, str(tmp_wav), max_new_tokens=max_tokens)
-                        try:
-                            subprocess.run(
-                                base_cmd + ["--device", device, "--dtype", dtype],
-                                check=True,
-                                env=env,
-                                timeout=timeout_sec,
-                            )
-                            success = True
-                            break
-                        except Exception:
-                            continue
-
-                if not success:
-                    # Keep pipeline alive on rare model hangs/failures.
-                    self._write_silence_wav(tmp_wav)
-
-                wav_paths.append(tmp_wav)
-
-            list_file = tmp_dir / "list.txt"
-            with list_file.open("w", encoding="utf-8") as f:
-                for p in wav_paths:
-                    f.write(f"file '{str(p).replace('\\', '/')}'\n")
-
-            merged_wav = tmp_dir / "merged.wav"
-            subprocess.run(
-                [
-                    self.ffmpeg_bin,
-                    "-y",
-                    "-f",
-                    "concat",
-                    "-safe",
-                    "0",
-                    "-i",
-                    str(list_file),
-                    "-c",
-                    "copy",
-                    str(merged_wav),
-                ],
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
+            wav_paths = [tmp_dir / f"part_{i:02d}.wav" for i in range(len(chunks))]
+
+            # Spread the batches over the worker pool, two in flight per worker so each one
+            # starts its next batch as soon as it finishes the last. The one-shot script
+            # path loads the whole model per chunk, so it keeps going one at a time.
+            in_flight = 2 * max(self.gpu_workers, self.cpu_workers) if self.use_wsl else 1
+            with ThreadPoolExecutor(max_workers=in_flight) as executor:
+                parts = executor.map(
+                    lambda batch: self._synthesize_batch(*batch, env),
+                    self._batches(chunks, wav_paths),
+                )
+                pcm = [chunk for batch in parts for chunk in batch]
+        # Keep pipeline alive on rare model hangs/failures, but don't let the clip be cached.
+        failed = any(chunk is None for chunk in pcm)
+        samples = np.concatenate(
+            [silence_samples(0.4, SAMPLE_RATE).reshape(-1) if c is None else c for c in pcm]
+        )
+        with self._degraded_lock:
+            if failed:
+                self._degraded.add(str(out_path))
+            else:
+                self._degraded.discard(str(out_path))
 
-            subprocess.run(
-                [
-                    self.ffmpeg_bin,
-                    "-y",
-                    "-i",
-                    str(merged_wav),
-                    "-ar",
-                    "44100",
-                    "-ac",
-                    "1",
-                    "-b:a",
-                    "192k",
-                    str(out_mp3),
-                ],
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
+        # The chunks come back as PCM, so the clip is assembled here and stored losslessly;
+        # only a caller asking for another format gets an encode.
+        if out_path.suffix.lower() == ".wav":
+            write_wav(samples, str(out_path), SAMPLE_RATE)
+        else:
+            encode_pcm(
+                samples,
+                str(out_path),
+                SAMPLE_RATE,
+                ["-ar", "44100", "-ac", "1", "-b:a", "192k"],
+                ffmpeg=self.ffmpeg_bin,
             )
@@ -1,7 +1,9 @@
 import argparse
+import base64
 import json
 from pathlib import Path
 
+import numpy as np
 import soundfile as sf
 import torch
 from qwen_tts import Qwen3TTSModel
@@ -15,8 +17,12 @@ def main():
     ap.add_argument("--language", default="English")
     ap.add_argument("--ref-audio", required=True)
     ap.add_argument("--ref-text-file", required=True)
+    ap.add_argument("--threads", type=int, default=0, help="torch CPU threads (0 = torch default)")
     args = ap.parse_args()
 
+    if args.threads > 0:
+        torch.set_num_threads(args.threads)
+
     dtype = {
         "float16": torch.float16,
         "bfloat16": torch.bfloat16,
@@ -31,43 +37,110 @@ def main():
         dtype=dtype,
     )
 
-    print(json.dumps({"ready": True, "device": args.device, "dtype": args.dtype}), flush=True)
+    prompt = None
+    if hasattr(model, "create_voice_clone_prompt"):
+        # Encode the reference clip once instead of on every request.
+        try:
+            prompt = model.create_voice_clone_prompt(
+                ref_audio=args.ref_audio,
+                ref_text=ref_text,
+                x_vector_only_mode=False,
+            )
+        except Exception:
+            prompt = None
+
+    def generate(texts, language, max_new_tokens):
+        if prompt is not None:
+            # One forward pass for the whole batch.
+            return model.generate_voice_clone(
+                text=texts,
+                language=[language] * len(texts),
+                voice_clone_prompt=prompt,
+                max_new_tokens=max_new_tokens,
+            )
+        # qwen_tts without prompt reuse: hand it the reference for every text.
+        wavs, sr = [], None
+        for text in texts:
+            out, sr = model.generate_voice_clone(
+                text=text,
+                language=language,
+                ref_audio=args.ref_audio,
+                ref_text=ref_text,
+                x_vector_only_mode=False,
+                max_new_tokens=max_new_tokens,
+            )
+            wavs.append(out[0])
+        return wavs, sr
+
+    print(
+        json.dumps(
+            {
+                "ready": True,
+                "device": args.device,
+                "dtype": args.dtype,
+                "prompt_cached": prompt is not None,
+            }
+        ),
+        flush=True,
+    )
 
     for line in iter(input, ""):
         line = line.strip()
         if not line:
             continue
+        req_id = None
         try:
             req = json.loads(line)
+            # Replies carry the request's id so the client can have several in flight.
+            req_id = req.get("id")
             if req.get("cmd") == "shutdown":
-                print(json.dumps({"ok": True, "shutdown": True}), flush=True)
+                print(json.dumps({"id": req_id, "ok": True, "shutdown": True}), flush=True)
                 break
 
-            text = (req.get("text") or "").strip()
-            out = req.get("out")
+            # {"texts": [...], "outs": [...]} is a batch; {"text", "out"} a single clip.
+            # With "pcm": true the audio comes back in the reply instead of as wav files.
+            batch = "texts" in req
+            texts = req.get("texts") if batch else [req.get("text")]
+            outs = req.get("outs") if batch else [req.get("out")]
+            return_pcm = bool(req.get("pcm"))
             max_new_tokens = int(req.get("max_new_tokens", 220))
             language = req.get("language", args.language)
 
-            if not out:
+            if not texts:
+                raise ValueError("missing text")
+            if not return_pcm and (not outs or len(texts) != len(outs) or not all(outs)):
                 raise ValueError("missing out path")
-            if not text:
-                text = "..."
+            texts = [(text or "").strip() or "..." for text in texts]
 
-            wavs, sr = model.generate_voice_clone(
-                text=text,
-                language=language,
-                ref_audio=args.ref_audio,
-                ref_text=ref_text,
-                x_vector_only_mode=False,
-                max_new_tokens=max_new_tokens,
-            )
+            wavs, sr = generate(texts, language, max_new_tokens)
+
+            reply = {"id": req_id, "ok": True, "sr": int(sr)}
+            if return_pcm:
+                # Mono int16, little-endian, base64 so it fits on the JSON line.
+                reply["pcm"] = [
+                    base64.b64encode(
+                        (np.clip(np.asarray(wav, dtype=np.float32), -1.0, 1.0) * 32767)
+                        .astype("<i2")
+                        .tobytes()
+                    ).decode("ascii")
+                    for wav in wavs
+                ]
+                print(json.dumps(reply), flush=True)
+                continue
 
-            out_path = Path(out)
-            out_path.parent.mkdir(parents=True, exist_ok=True)
-            sf.write(str(out_path), wavs[0], sr)
-            print(json.dumps({"ok": True, "out": str(out_path), "sr": int(sr)}), flush=True)
+            out_paths = []
+            for wav, out in zip(wavs, outs):
+                out_path = Path(out)
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                sf.write(str(out_path), wav, sr)
+                out_paths.append(str(out_path))
+            if batch:
+                reply["outs"] = out_paths
+            else:
+                reply["out"] = out_paths[0]
+            print(json.dumps(reply), flush=True)
         except Exception as e:
-            print(json.dumps({"ok": False, "error": str(e)}), flush=True)
+            print(json.dumps({"id": req_id, "ok": False, "error": str(e)}), flush=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket that spaces out requests to a rate-limited API.
+
+    Args:
+        rate (float): Tokens added per second, i.e. the sustained requests per second.
+        burst (Optional) : Bucket size, i.e. how many requests may go out back to back.
+
+    Notes:
+        reserve() hands out a token right away and returns how long the caller has to wait
+        before using it, so the same bucket works for threads (time.sleep) and coroutines
+        (asyncio.sleep) without anyone sleeping while holding its lock.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._started = None
+        self.requests = 0
+        self.waited = 0.0
+
+    def reserve(self) -> float:
+        """Takes a token and returns the seconds to wait before the request may be sent."""
+        with self._lock:
+            now = time.monotonic()
+            if self._started is None:
+                self._started = now
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate)
+            self.requests += 1
+            self.waited += wait
+            return wait
+
+    def acquire(self) -> float:
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def summary(self) -> str:
+        if not self.requests:
+            return "no requests"
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        return (
+            f"{self.requests} requests, {self.requests / elapsed:.2f} req/s, "
+            f"{self.waited:.2f}s waiting on the rate limit"
+        )
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter for the given (0-based) retry attempt."""
+    return random.uniform(0, min(cap, base * 2**attempt))
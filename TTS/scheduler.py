@@ -0,0 +1,111 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+
+from utils import settings
+
+DEFAULT_SYNTHESIS_WORKERS: int = 4
+
+# One semaphore per provider class, shared by every engine in the process, so the
+# provider's own limit holds even when several jobs call it at the same time.
+_provider_slots: Dict[str, threading.BoundedSemaphore] = {}
+_provider_slots_lock = threading.Lock()
+
+
+def provider_slots(tts_module) -> threading.BoundedSemaphore:
+    """Returns the semaphore that caps concurrent calls into the given TTS provider.
+
+    Providers declare their limit with a ``max_concurrency`` attribute (next to ``max_chars``).
+    Providers without one are treated as not thread-safe and get a single slot.
+    """
+    name = type(tts_module).__name__
+    with _provider_slots_lock:
+        if name not in _provider_slots:
+            limit = max(1, int(getattr(tts_module, "max_concurrency", 1)))
+            _provider_slots[name] = threading.BoundedSemaphore(limit)
+        return _provider_slots[name]
+
+
+@contextmanager
+def held_slots(tts_module) -> Iterator[int]:
+    """Holds one of the provider's slots, waiting for it, plus every other one that is free.
+
+    Yields how many slots are held, so a batch call can size its own pool to them without
+    going over the provider's limit. Only the first slot is waited for, so two batches can't
+    deadlock each holding part of the slots.
+    """
+    slots = provider_slots(tts_module)
+    limit = max(1, int(getattr(tts_module, "max_concurrency", 1)))
+    slots.acquire()
+    held = 1
+    try:
+        while held < limit and slots.acquire(blocking=False):
+            held += 1
+        yield held
+    finally:
+        for _ in range(held):
+            slots.release()
+
+
+class TTSScheduler:
+    """Runs TTS jobs on a bounded thread pool and hands the results back in submission order.
+
+    Args:
+        tts_module              : The TTS provider instance, used to size the pool.
+        max_workers (Optional)  : Pool size. Defaults to the ``synthesis_workers`` setting.
+
+    Notes:
+        The pool is never larger than the provider's ``max_concurrency``; the provider
+        semaphore from provider_slots() enforces the same limit for nested calls.
+    """
+
+    def __init__(self, tts_module, max_workers: int = None):
+        if max_workers is None:
+            max_workers = settings.config["settings"]["tts"].get(
+                "synthesis_workers", DEFAULT_SYNTHESIS_WORKERS
+            )
+        provider_limit = max(1, int(getattr(tts_module, "max_concurrency", 1)))
+        self.max_workers = max(1, min(int(max_workers), provider_limit))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tts")
+
+    def submit(self, fn: Callable, *args) -> Future:
+        return self._executor.submit(fn, *args)
+
+    def ordered(self, jobs: Iterable[Tuple[Callable, tuple]]) -> Iterator:
+        """Yields the result of every (fn, args) job in the order the jobs were given.
+
+        At most ``max_workers`` jobs run ahead of the consumer. If the consumer stops
+        iterating (e.g. the video is already long enough), queued jobs are cancelled
+        and no further jobs are started.
+        """
+        jobs = iter(jobs)
+        pending = deque()
+
+        def fill():
+            while len(pending) < self.max_workers:
+                job = next(jobs, None)
+                if job is None:
+                    return
+                fn, args = job
+                pending.append(self.submit(fn, *args))
+
+        try:
+            fill()
+            while pending:
+                result = pending.popleft().result()
+                fill()
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.shutdown()
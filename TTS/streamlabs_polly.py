@@ -1,10 +1,16 @@
+import asyncio
 import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import JSONDecodeError
 
+from TTS.aio import aiohttp, get_session
+from TTS.ratelimit import backoff_delay
 from utils import settings
-from utils.voice import check_ratelimit
 
 voices = [
     "Brian",
@@ -27,41 +33,144 @@ voices = [
 
 # valid voices https://lazypy.ro/tts/
 
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 5
+RATE_LIMIT_ERROR = f"Streamlabs Polly is still rate limiting after {MAX_RETRIES} retries."
+
 
 class StreamlabsPolly:
     def __init__(self):
         self.url = "https://streamlabs.com/polly/speak"
         self.max_chars = 550
+        self.max_concurrency = 2
         self.voices = voices
 
+        # one pooled session for the speak requests and the audio downloads
+        self._session = requests.Session()
+        self._session.headers["Referer"] = "https://streamlabs.com/"
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.max_concurrency)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
     def run(self, text, filepath, random_voice: bool = False):
-        if random_voice:
-            voice = self.randomvoice()
-        else:
-            if not settings.config["settings"]["tts"]["streamlabs_polly_voice"]:
-                raise ValueError(
-                    f"Please set the config variable STREAMLABS_POLLY_VOICE to a valid voice. options are: {voices}"
-                )
-            voice = str(settings.config["settings"]["tts"]["streamlabs_polly_voice"]).capitalize()
+        speak_url = self._speak(text, self._voice(random_voice))
+        if speak_url is not None:
+            self._download(speak_url, filepath)
 
-        body = {"voice": voice, "text": text, "service": "polly"}
-        headers = {"Referer": "https://streamlabs.com/"}
-        response = requests.post(self.url, headers=headers, data=body)
+    def run_batch(
+        self,
+        jobs: List[Tuple[str, str]],
+        random_voice: bool = False,
+        max_workers: Optional[int] = None,
+    ):
+        """Synthesizes several (text, filepath) jobs on one pool of max_workers threads
+        (max_concurrency by default), each speaking and then downloading a job. The audio of
+        one job is downloaded while the speak requests of the others are still in flight.
+        """
+        workers = min(max_workers or self.max_concurrency, self.max_concurrency)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda job: self.run(*job, random_voice=random_voice), jobs))
 
-        if not check_ratelimit(response):
-            self.run(text, filepath, random_voice)
+    async def arun(self, text, filepath, random_voice: bool = False):
+        """Same as run, through the shared aiohttp session on the TTS loop."""
+        body = {"voice": self._voice(random_voice), "text": text, "service": "polly"}
+        session, headers = get_session(), dict(self._session.headers)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with session.post(
+                    self.url, data=body, headers=headers, timeout=timeout
+                ) as response:
+                    status, reset = response.status, response.headers.get("X-RateLimit-Reset")
+                    try:
+                        payload = await response.json(content_type=None)
+                    except ValueError:
+                        payload = None
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = self._backoff(attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            delay = self._backoff(attempt, status, reset)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        if status == 429:
+            raise RuntimeError(RATE_LIMIT_ERROR)
+
+        speak_url = self._speak_url(payload)
+        if speak_url is not None:
+            async with session.get(speak_url, timeout=timeout) as voice_data:
+                content = await voice_data.read()
+            with open(filepath, "wb") as f:
+                f.write(content)
 
-        else:
+    def _speak(self, text: str, voice: str) -> Optional[str]:
+        """Requests the synthesis and returns the URL of the audio, or None on an API error."""
+        body = {"voice": voice, "text": text, "service": "polly"}
+        for attempt in range(MAX_RETRIES + 1):
             try:
-                voice_data = requests.get(response.json()["speak_url"])
-                with open(filepath, "wb") as f:
-                    f.write(voice_data.content)
-            except (KeyError, JSONDecodeError):
-                try:
-                    if response.json()["error"] == "No text specified!":
-                        raise ValueError("Please specify a text to convert to speech.")
-                except (KeyError, JSONDecodeError):
-                    print("Error occurred calling Streamlabs Polly")
+                response = self._session.post(self.url, data=body, timeout=REQUEST_TIMEOUT)
+            except (requests.ConnectionError, requests.Timeout):
+                delay = self._backoff(attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            reset = response.headers.get("X-RateLimit-Reset")
+            delay = self._backoff(attempt, response.status_code, reset)
+            if delay is None:
+                break
+            time.sleep(delay)
+        if response.status_code == 429:
+            raise RuntimeError(RATE_LIMIT_ERROR)
+
+        try:
+            payload = response.json()
+        except JSONDecodeError:
+            payload = None
+        return self._speak_url(payload)
+
+    @staticmethod
+    def _backoff(
+        attempt: int, http_status: Optional[int] = None, reset: Optional[str] = None
+    ) -> Optional[float]:
+        """The retry policy _speak and arun share.
+
+        Returns the seconds to wait before the next attempt, or None if there is none: the
+        response is not a rate limit or the retries ran out. http_status is None for a
+        dropped connection or a timeout. A rate limit with X-RateLimit-Reset waits until then.
+        """
+        if attempt == MAX_RETRIES or http_status not in (None, 429):
+            return None
+        if reset is not None:
+            print(f"Ratelimit hit. Sleeping for {int(reset) - int(time.time())} seconds.")
+            return max(0.0, int(reset) - time.time())
+        return backoff_delay(attempt)
+
+    @staticmethod
+    def _speak_url(payload: Optional[dict]) -> Optional[str]:
+        if isinstance(payload, dict) and "speak_url" in payload:
+            return payload["speak_url"]
+        if isinstance(payload, dict) and payload.get("error") == "No text specified!":
+            raise ValueError("Please specify a text to convert to speech.")
+        print("Error occurred calling Streamlabs Polly")
+        return None
+
+    def _download(self, speak_url: str, filepath: str):
+        voice_data = self._session.get(speak_url, timeout=REQUEST_TIMEOUT)
+        with open(filepath, "wb") as f:
+            f.write(voice_data.content)
+
+    def _voice(self, random_voice: bool) -> str:
+        if random_voice:
+            return self.randomvoice()
+        if not settings.config["settings"]["tts"]["streamlabs_polly_voice"]:
+            raise ValueError(
+                f"Please set the config variable STREAMLABS_POLLY_VOICE to a valid voice. options are: {voices}"
+            )
+        return str(settings.config["settings"]["tts"]["streamlabs_polly_voice"]).capitalize()
 
     def randomvoice(self):
         return random.choice(self.voices)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Tests for the asyncio TTS path: clips come back in order and providers keep their caps
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from TTS import aio
+from utils import settings
+
+pytestmark = pytest.mark.skipif(aio.aiohttp is None, reason="aiohttp is not installed")
+
+
+class _Provider:
+    max_concurrency = 3
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    async def arun(self, text, filepath, random_voice=False):
+        async with aio.provider_slots(self):
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            # Later clips finish first, so ordering can't come from completion order.
+            await asyncio.sleep(0.01 * (10 - int(text)))
+            self.running -= 1
+
+
+def test_async_scheduler_keeps_order_and_caps_requests(monkeypatch):
+    monkeypatch.setattr(
+        settings, "config", {"settings": {"tts": {"synthesis_workers": 2}}}, raising=False
+    )
+    provider = _Provider()
+
+    async def clip(i):
+        await provider.arun(str(i), None)
+        return i
+
+    def spliced(i):  # plain functions run on the scheduler's thread pool
+        return aio.run_async(clip(i))
+
+    jobs = [(clip if i % 3 else spliced, (i,)) for i in range(10)]
+    with aio.AsyncScheduler(provider) as scheduler:
+        assert list(scheduler.ordered(jobs)) == list(range(10))
+    assert provider.peak == provider.max_concurrency
+
+
+def test_supports_async_needs_a_coroutine_arun():
+    class Threaded:
+        def run(self, text, filepath, random_voice=False):
+            pass
+
+    assert aio.supports_async(_Provider())
+    assert not aio.supports_async(Threaded())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Tests for the TTS cache: stand-in clips from failed syntheses must never be cached
+"""
+
+import os
+import sys
+import wave
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from TTS import qwen3_clone
+from TTS.aws_polly import AWSPolly
+from TTS.cache import TTSCache, params_for
+from TTS.engine_wrapper import TTSEngine
+from utils import settings
+
+
+def _samples(path):
+    with wave.open(path, "rb") as f:
+        return np.frombuffer(f.readframes(f.getnframes()), dtype="<i2")
+
+
+def _config():
+    return {
+        "reddit": {"thread": {"post_lang": ""}},
+        "settings": {
+            "tts": {
+                "random_voice": False,
+                "censor_swear_words": False,
+                "plan_comments": False,
+                "tts_cache": False,
+            },
+        },
+    }
+
+
+def test_failed_synthesis_is_not_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "config", _config(), raising=False)
+    monkeypatch.setenv("QWEN3_USE_WSL", "1")
+    speech = np.full(2400, 1000, dtype=np.int16)
+    calls = []
+
+    def worker_request(self, device, dtype, env, texts, max_tokens, timeout_sec):
+        calls.append(texts)
+        # The first run fails on every device; the ones after it work.
+        return None if len(calls) <= len(qwen3_clone.ATTEMPTS) else [speech] * len(texts)
+
+    monkeypatch.setattr(qwen3_clone.Qwen3Clone, "_run_worker_request", worker_request)
+    engine = TTSEngine(qwen3_clone.Qwen3Clone, {"thread_id": "t1"}, path=f"{tmp_path}/")
+    engine.cache = TTSCache(directory=str(tmp_path / "cache"))
+    os.makedirs(engine.path)
+    clip = f"{engine.path}/title.wav"
+
+    # Every attempt fails: the clip is written with stand-in silence, but not cached.
+    engine._provider_run("A title worth reading", clip)
+    assert not np.any(_samples(clip))
+    assert os.listdir(tmp_path / "cache") == []
+
+    # The next run tries the synthesis again instead of replaying the silence.
+    failed_calls = len(calls)
+    engine._provider_run("A title worth reading", clip)
+    assert len(calls) == failed_calls + 1
+    assert np.array_equal(_samples(clip), speech)
+
+    # Now that the clip is real it is cached, and served without calling the provider.
+    engine._provider_run("A title worth reading", clip)
+    assert len(calls) == failed_calls + 1
+    assert engine.cache.hits == 1
+
+
+def test_polly_engine_is_part_of_cache_key():
+    polly = AWSPolly()
+    neural = TTSCache.key("AWSPolly", "Matthew", "en", "Hello", params_for(polly))
+    polly.engine = "standard"
+    standard = TTSCache.key("AWSPolly", "Matthew", "en", "Hello", params_for(polly))
+    assert neural != standard
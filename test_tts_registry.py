@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+"""
+Tests for the TTS provider registry: importing it must not import any provider's SDK
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_voices_imports_no_provider_sdk():
+    # A fresh interpreter, so modules other tests imported don't count.
+    code = (
+        "import sys, video_creation.voices; "
+        "print(','.join(m for m in ('boto3', 'elevenlabs', 'pyttsx3', 'TTS.qwen3_clone') "
+        "if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == ""
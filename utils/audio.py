@@ -0,0 +1,293 @@
+import os
+import struct
+import subprocess
+import tempfile
+import threading
+import wave
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# MPEG audio frame header tables, indexed by the version bits (0 = 2.5, 2 = 2, 3 = 1).
+_MPEG_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+_MPEG_BITRATES = {
+    # (version is MPEG-1, layer) -> kbit/s by bitrate index
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+
+def _parse_mpeg_header(data: bytes, pos: int):
+    """Returns (frame_size, samples_per_frame, sample_rate, channels) or None."""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version = (b1 >> 3) & 0x03
+    layer = 4 - ((b1 >> 1) & 0x03)
+    bitrate_idx = (b2 >> 4) & 0x0F
+    rate_idx = (b2 >> 2) & 0x03
+    if version == 1 or layer == 4 or bitrate_idx in (0, 15) or rate_idx == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = _MPEG_BITRATES[(mpeg1, layer)][bitrate_idx] * 1000
+    sample_rate = _MPEG_SAMPLE_RATES[version][rate_idx]
+    padding = (b2 >> 1) & 0x01
+    channels = 1 if (b3 >> 6) == 3 else 2
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate, channels
+    samples = 1152 if layer == 2 or mpeg1 else 576
+    return samples // 8 * bitrate // sample_rate + padding, samples, sample_rate, channels
+
+
+def _first_mpeg_frame(data: bytes):
+    """Returns (pos, header, end) of the first MPEG frame after any ID3 tag, or None."""
+    pos = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = data[6] << 21 | data[7] << 14 | data[8] << 7 | data[9]
+        pos = 10 + size + (10 if data[5] & 0x10 else 0)
+    end = len(data) - 128 if data[-128:-125] == b"TAG" else len(data)
+
+    # Find the first frame whose successor is also a valid frame header.
+    while pos < end:
+        header = _parse_mpeg_header(data, pos)
+        if header and (pos + header[0] >= end or _parse_mpeg_header(data, pos + header[0])):
+            return pos, header, end
+        pos += 1
+    return None
+
+
+def _mp3_duration(data: bytes) -> Optional[float]:
+    first = _first_mpeg_frame(data)
+    if first is None:
+        return None
+    pos, header, end = first
+
+    frame_size, samples, sample_rate, channels = header
+    # VBR files carry the frame count in a Xing/Info or VBRI header inside the first frame.
+    mpeg1 = samples == 1152 and sample_rate >= 32000
+    side_info = (32 if channels == 2 else 17) if mpeg1 else (17 if channels == 2 else 9)
+    xing = pos + 4 + side_info
+    if data[xing : xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", data[xing + 4 : xing + 8])[0]
+        if flags & 0x01:
+            frames = struct.unpack(">I", data[xing + 8 : xing + 12])[0]
+            # The LAME tag after the Xing fields records the encoder delay and end padding.
+            lame = xing + 8 + 4 * bool(flags & 0x01) + 4 * bool(flags & 0x02)
+            lame += 100 * bool(flags & 0x04) + 4 * bool(flags & 0x08)
+            trim = 0
+            if data[lame : lame + 4] in (b"LAME", b"Lavc", b"Lavf") and lame + 24 <= len(data):
+                delay_padding = int.from_bytes(data[lame + 21 : lame + 24], "big")
+                trim = (delay_padding >> 12) + (delay_padding & 0xFFF)
+            return max(frames * samples - trim, 0) / sample_rate
+    if data[pos + 36 : pos + 40] == b"VBRI":
+        frames = struct.unpack(">I", data[pos + 50 : pos + 54])[0]
+        return frames * samples / sample_rate
+
+    # CBR (or unknown VBR): walk the frame headers.
+    total_samples = 0
+    while pos < end:
+        header = _parse_mpeg_header(data, pos)
+        if header is None:
+            break
+        total_samples += header[1]
+        pos += header[0]
+    return total_samples / sample_rate if total_samples else None
+
+
+def _wav_duration(data: bytes) -> Optional[float]:
+    pos = 12
+    byte_rate = None
+    while pos + 8 <= len(data):
+        chunk_id, chunk_size = data[pos : pos + 4], struct.unpack("<I", data[pos + 4 : pos + 8])[0]
+        if chunk_id == b"fmt ":
+            byte_rate = struct.unpack("<I", data[pos + 16 : pos + 20])[0]
+        elif chunk_id == b"data" and byte_rate:
+            # Streamed WAVs leave the size at 0 or 0xFFFFFFFF; the data runs to the end then.
+            if chunk_size in (0, 0xFFFFFFFF) or pos + 8 + chunk_size > len(data):
+                chunk_size = len(data) - pos - 8
+            return chunk_size / byte_rate
+        pos += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _wav_format(data: bytes) -> Optional[Tuple[int, int]]:
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id, chunk_size = data[pos : pos + 4], struct.unpack("<I", data[pos + 4 : pos + 8])[0]
+        if chunk_id == b"fmt " and pos + 16 <= len(data):
+            channels, sample_rate = struct.unpack("<HI", data[pos + 10 : pos + 16])
+            return sample_rate, channels
+        pos += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def get_format(path: str) -> Optional[Tuple[int, int]]:
+    """Returns the (sample_rate, channels) of an MP3 or WAV file from its headers alone.
+
+    Args:
+        path (str): Path to the audio file. The container is detected from its content.
+
+    Returns:
+        Tuple[int,int]|None: Sample rate and channel count, or None if the file isn't MP3/WAV
+            or is unreadable.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < 12:
+        return None
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return _wav_format(data)
+    first = _first_mpeg_frame(data)
+    return (first[1][2], first[1][3]) if first else None
+
+
+def get_duration(path: str) -> Optional[float]:
+    """Returns the duration of an MP3 or WAV file in seconds from its headers/frames alone.
+
+    Args:
+        path (str): Path to the audio file. The container is detected from its content.
+
+    Returns:
+        float|None: Duration in seconds, or None if the file isn't MP3/WAV or is unreadable.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < 12:
+        return None
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return _wav_duration(data)
+    return _mp3_duration(data)
+
+
+def decode_pcm(paths: List[str], sample_rate: int = 44100, channels: int = 1) -> List[np.ndarray]:
+    """Decodes audio files to int16 PCM arrays with a single ffmpeg process.
+
+    Args:
+        paths (List[str]): Files to decode. Each one becomes its own array.
+        sample_rate (int): Sample rate everything is resampled to.
+        channels (int): Channel count everything is mixed to.
+
+    Returns:
+        List[np.ndarray]: One array of shape (samples, channels) per path, in the same order.
+    """
+    if not paths:
+        return []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+        for path in paths:
+            cmd += ["-i", path]
+        outputs = [os.path.join(tmp_dir, f"{i}.raw") for i in range(len(paths))]
+        for i, output in enumerate(outputs):
+            cmd += ["-map", f"{i}:a", "-f", "s16le", "-ar", str(sample_rate)]
+            cmd += ["-ac", str(channels), output]
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        return [np.fromfile(output, dtype=np.int16).reshape(-1, channels) for output in outputs]
+
+
+def encode_pcm(
+    samples: np.ndarray,
+    path: str,
+    sample_rate: int = 44100,
+    codec_args: List[str] = None,
+    ffmpeg: str = "ffmpeg",
+) -> None:
+    """Encodes an int16 PCM array of shape (samples, channels) to path with one ffmpeg process."""
+    channels = samples.shape[1] if samples.ndim == 2 else 1
+    if codec_args is None:
+        codec_args = ["-c:a", "libmp3lame", "-q:a", "4"]
+    subprocess.run(
+        [ffmpeg, "-y", "-hide_banner", "-loglevel", "error"]
+        + ["-f", "s16le", "-ar", str(sample_rate), "-ac", str(channels), "-i", "pipe:0"]
+        + codec_args
+        + [path],
+        input=np.ascontiguousarray(samples, dtype=np.int16).tobytes(),
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+
+
+def write_wav(samples: np.ndarray, path: str, sample_rate: int = 44100) -> None:
+    """Writes an int16 PCM array of shape (samples, channels) as a WAV file, without ffmpeg."""
+    channels = samples.shape[1] if samples.ndim == 2 else 1
+    with wave.open(path, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(np.ascontiguousarray(samples, dtype="<i2").tobytes())
+
+
+DEFAULT_SILENCE_DIR: str = "assets/silence"
+
+_silence_files = set()
+_silence_lock = threading.Lock()
+
+
+@lru_cache(maxsize=64)
+def silence_samples(duration: float, sample_rate: int = 44100, channels: int = 1) -> np.ndarray:
+    """Returns a shared, read-only block of int16 silence of shape (samples, channels)."""
+    samples = np.zeros((int(round(duration * sample_rate)), channels), dtype=np.int16)
+    samples.flags.writeable = False
+    return samples
+
+
+def silence_file(
+    duration: float,
+    sample_rate: int = 44100,
+    channels: int = 1,
+    fmt: str = "mp3",
+    directory: str = DEFAULT_SILENCE_DIR,
+) -> str:
+    """Returns the path of a silent clip, writing it only the first time it is asked for.
+
+    Clips are kept on disk between runs, named after their duration (to the millisecond),
+    sample rate and channel count, so inserting a gap costs no encoding work.
+
+    Args:
+        duration (float): Length of the gap in seconds.
+        sample_rate (int): Sample rate of the clip. Match the clips it is concatenated with.
+        channels (int): Channel count of the clip.
+        fmt (str): "mp3" or "wav". WAV clips are written directly, without ffmpeg.
+        directory (str): Where the pool lives.
+
+    Returns:
+        str: Absolute path of the clip.
+    """
+    millis = int(round(duration * 1000))
+    path = os.path.abspath(
+        os.path.join(directory, f"silence-{millis}ms-{sample_rate}hz-{channels}ch.{fmt}")
+    )
+    with _silence_lock:
+        if path in _silence_files or os.path.isfile(path) and os.path.getsize(path) > 0:
+            _silence_files.add(path)
+            return path
+        os.makedirs(directory, exist_ok=True)
+        samples = silence_samples(millis / 1000, sample_rate, channels)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".", suffix=f".{fmt}")
+        os.close(fd)
+        try:
+            if fmt == "wav":
+                write_wav(samples, tmp, sample_rate)
+            else:
+                encode_pcm(samples, tmp, sample_rate)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        _silence_files.add(path)
+        return path
@@ -0,0 +1,30 @@
+import json
+import os
+from typing import Dict, List
+
+MANIFEST_NAME = "manifest.json"
+
+
+def write_manifest(directory: str, clips: List[Dict]) -> str:
+    """Writes the clip manifest of a thread next to its audio files.
+
+    Args:
+        directory (str): The thread's audio directory (assets/temp/<id>/mp3).
+        clips (List[Dict]): One {"name", "path", "duration"} entry per clip, in playback order.
+
+    Returns:
+        str: Path of the manifest file.
+    """
+    path = os.path.join(directory, MANIFEST_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"clips": clips}, f, ensure_ascii=False, indent=4)
+    return path
+
+
+def read_manifest(directory: str) -> List[Dict]:
+    """Returns the clips recorded by write_manifest, or an empty list if there is no manifest."""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f).get("clips", [])
+    except (OSError, ValueError):
+        return []
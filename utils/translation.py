@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_CACHE_PATH: str = "assets/translation_cache.json"
+TRANSLATOR: str = "google"
+# Google Translate rejects queries much past 5000 characters.
+MAX_BATCH_CHARS: int = 4500
+# Strings in a batched query are separated by a blank line, which the translator keeps.
+_SEPARATOR = "\n\n"
+
+_lock = threading.Lock()
+_cache: Optional[Dict[str, str]] = None
+
+
+def _key(text: str, lang: str) -> str:
+    digest = hashlib.sha256(f"{TRANSLATOR}\0{lang}\0{text}".encode("utf-8")).hexdigest()
+    return digest[:40]
+
+
+def _load() -> Dict[str, str]:
+    global _cache
+    if _cache is None:
+        try:
+            with open(DEFAULT_CACHE_PATH, encoding="utf-8") as f:
+                _cache = json.load(f)
+        except (OSError, ValueError):
+            _cache = {}
+    return _cache
+
+
+def _save():
+    directory = os.path.dirname(DEFAULT_CACHE_PATH) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(_cache, f, ensure_ascii=False)
+        os.replace(tmp, DEFAULT_CACHE_PATH)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _batches(texts: List[str]) -> Iterable[List[str]]:
+    batch, size = [], 0
+    for text in texts:
+        if _SEPARATOR in text or len(text) > MAX_BATCH_CHARS:
+            # Can't be told apart from its neighbours in a joined result; send it on its own.
+            yield [text]
+            continue
+        if batch and size + len(_SEPARATOR) + len(text) > MAX_BATCH_CHARS:
+            yield batch
+            batch, size = [], 0
+        size += len(text) + (len(_SEPARATOR) if batch else 0)
+        batch.append(text)
+    if batch:
+        yield batch
+
+
+def _translate_batch(batch: List[str], lang: str) -> List[str]:
+    # Imported here because translators contacts its servers as soon as it is imported, which
+    # fails offline and is wasted on the runs that never translate anything.
+    import translators
+
+    if len(batch) > 1:
+        joined = translators.translate_text(
+            _SEPARATOR.join(batch), translator=TRANSLATOR, to_language=lang
+        )
+        parts = [part.strip() for part in str(joined).split(_SEPARATOR)]
+        if len(parts) == len(batch):
+            return parts
+        # The translator merged or split paragraphs; fall back to one request per string.
+    return [
+        translators.translate_text(text, translator=TRANSLATOR, to_language=lang) for text in batch
+    ]
+
+
+def translate_many(texts: Iterable[str], lang: str) -> List[str]:
+    """Translates several strings with as few requests as possible.
+
+    Strings are deduplicated, looked up in the persistent cache (keyed by a hash of the text
+    and the language) and only the misses are sent, joined into batched queries.
+
+    Args:
+        texts (Iterable[str]): Strings to translate.
+        lang (str): Target language code, as in the post_lang setting.
+
+    Returns:
+        List[str]: The translations, in the same order as texts.
+    """
+    texts = [str(text) for text in texts]
+    with _lock:
+        cache = _load()
+        missing = list(dict.fromkeys(t for t in texts if t.strip() and _key(t, lang) not in cache))
+        for batch in _batches(missing):
+            for text, translated in zip(batch, _translate_batch(batch, lang)):
+                cache[_key(text, lang)] = translated
+        if missing:
+            _save()
+        return [cache.get(_key(text, lang), text) for text in texts]
+
+
+def translate(text: str, lang: str) -> str:
+    """Translates one string through the shared cache. See translate_many."""
+    return translate_many([text], lang)[0]
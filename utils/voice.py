@@ -2,9 +2,10 @@ import re
 import sys
 import time as pytime
 from datetime import datetime
+from functools import lru_cache
 from time import sleep
+from typing import List
 
-from cleantext import clean
 from requests import Response
 
 from utils import settings
@@ -65,6 +66,36 @@ def sleep_until(time) -> None:
             sleep(diff / 2)
 
 
+# Links, as removed from comment bodies and from text sent to TTS.
+_URLS = re.compile(
+    r"((http|https)\:\/\/)?[a-zA-Z0-9\.\/\?\:@\-_=#]+\.([a-zA-Z]){2,6}([a-zA-Z0-9\.\&\/\?\:@\-_=#])*"
+)
+# note: not removing apostrophes
+_SPECIAL_CHARS = re.compile(r"\s['|’]|['|’]\s|[\^_~@!&;#:\-%—“”‘\"%\*/{}\[\]\(\)\\|<>=+]")
+_AI = re.compile(r"\bAI\b")
+_AGI = re.compile(r"\bAGI\b")
+_QUOTED_PERIOD = re.compile(r'\."\.')
+
+
+@lru_cache(maxsize=16384)
+def normalize_body(text: str) -> str:
+    """Prepares a comment body for TTS: drops links and ends every paragraph with a period,
+    since people often forget them and TTS would blend the sentences together.
+
+    Args:
+        text (str): The comment body.
+
+    Returns:
+        str: The normalized body. Results are memoized, so repeated bodies cost nothing.
+    """
+    result = _URLS.sub(" ", text).replace("\n", ". ")
+    result = _AGI.sub("A.G.I", _AI.sub("A.I", result))
+    if not result.endswith("."):
+        result += "."
+    result = result.replace(". . .", ".").replace(".. . ", ".").replace(". . ", ".")
+    return _QUOTED_PERIOD.sub('".', result)
+
+
 def sanitize_text(text: str) -> str:
     r"""Sanitizes the text for tts.
         What gets removed:
@@ -77,20 +108,65 @@ def sanitize_text(text: str) -> str:
     Returns:
         str: Sanitized text
     """
+    return _sanitize(text, bool(settings.config["settings"]["tts"]["no_emojis"]))
 
-    # remove any urls from the text
-    regex_urls = r"((http|https)\:\/\/)?[a-zA-Z0-9\.\/\?\:@\-_=#]+\.([a-zA-Z]){2,6}([a-zA-Z0-9\.\&\/\?\:@\-_=#])*"
-
-    result = re.sub(regex_urls, " ", text)
 
-    # note: not removing apostrophes
-    regex_expr = r"\s['|’]|['|’]\s|[\^_~@!&;#:\-%—“”‘\"%\*/{}\[\]\(\)\\|<>=+]"
-    result = re.sub(regex_expr, " ", result)
+@lru_cache(maxsize=16384)
+def _sanitize(text: str, no_emojis: bool) -> str:
+    # remove any urls from the text
+    result = _URLS.sub(" ", text)
+    result = _SPECIAL_CHARS.sub(" ", result)
     result = result.replace("+", "plus").replace("&", "and")
 
     # emoji removal if the setting is enabled
-    if settings.config["settings"]["tts"]["no_emojis"]:
+    if no_emojis:
+        # cleantext builds its tables on import, which takes about half a second.
+        from cleantext import clean
+
         result = clean(result, no_emoji=True)
 
     # remove extra whitespace
     return " ".join(result.split())
+
+
+# Whitespace after a sentence end, optionally behind a closing quote or bracket.
+_SENTENCE_BREAK = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"'’”)\]]))\s+")
+
+
+def split_sentences(text: str, max_chars: int) -> List[str]:
+    """Packs whole sentences into as few chunks of at most max_chars as possible.
+
+    Runs in linear time. Sentences are kept whole whenever they fit, and consecutive ones
+    share a chunk until the next would overflow it. Greedy packing in order gives the fewest
+    chunks, i.e. the fewest TTS requests. A sentence longer than max_chars is split between
+    words, and a single word longer than that is cut. No text is dropped.
+
+    Args:
+        text (str): Text to split.
+        max_chars (int): The provider's max_chars.
+
+    Returns:
+        List[str]: The chunks, in order. Empty if the text is blank.
+    """
+    max_chars = max(1, int(max_chars))
+    chunks, current, size = [], [], 0
+
+    def add(piece: str):
+        nonlocal current, size
+        if current and size + 1 + len(piece) > max_chars:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+        size += len(piece) + (1 if current else 0)
+        current.append(piece)
+
+    for sentence in _SENTENCE_BREAK.split(text.strip()):
+        if len(sentence) <= max_chars:
+            if sentence:
+                add(sentence)
+            continue
+        for word in sentence.split():
+            for start in range(0, len(word), max_chars):
+                add(word[start : start + max_chars])
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
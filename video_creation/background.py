@@ -1,31 +1,24 @@
 import json
 import random
-import re
 from pathlib import Path
 from random import randrange
 from typing import Any, Dict, Tuple
 
 import yt_dlp
-try:
-    from moviepy.editor import AudioFileClip, VideoFileClip
-except ModuleNotFoundError:
-    from moviepy import AudioFileClip, VideoFileClip
-
-try:
-    from moviepy.video.io.ffmpeg_tools import ffmpeg_extract_subclip
-except ModuleNotFoundError:
-    ffmpeg_extract_subclip = None
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 
 from utils import settings
 from utils.console import print_step, print_substep
 
 
-def _subclip_compat(clip, start_time, end_time):
-    if hasattr(clip, "subclip"):
-        return clip.subclip(start_time, end_time)
-    if hasattr(clip, "subclipped"):
-        return clip.subclipped(start_time, end_time)
-    raise AttributeError("Clip object has neither subclip nor subclipped")
+def background_path(background_config: Dict[str, Tuple], mode: str) -> str:
+    """Path of the downloaded library file for the "video" or "audio" background."""
+    return f"assets/backgrounds/{mode}/{background_config[mode][2]}-{background_config[mode][1]}"
+
+
+def _media_duration(path: str) -> float:
+    # Reads the container header with a single `ffmpeg -i`; nothing is decoded.
+    return ffmpeg_parse_infos(path)["duration"]
 
 
 def load_background_options():
@@ -136,50 +129,32 @@ def download_background_audio(background_config: Tuple[str, str, str]):
 
 
 def chop_background(background_config: Dict[str, Tuple], video_length: int, reddit_object: dict):
-    """Generates the background audio and footage to be used in the video and writes it to assets/temp/background.mp3 and assets/temp/background.mp4
+    """Picks the stretch of the background footage and audio to use and stores it in
+    background_config["video_window"] and background_config["audio_window"].
+
+    Nothing is cut or re-encoded here: the final render seeks straight into the library
+    files (input -ss/-t) and crops and mixes them inline.
 
     Args:
         background_config (Dict[str,Tuple]]) : Current background configuration
         video_length (int): Length of the clip where the background footage is to be taken out of
     """
-    id = re.sub(r"[^\w\s-]", "", reddit_object["thread_id"])
-
+    background_config["audio_window"] = None
     if settings.config["settings"]["background"][f"background_audio_volume"] == 0:
         print_step("Volume was set to 0. Skipping background audio creation . . .")
     else:
         print_step("Finding a spot in the backgrounds audio to chop...✂️")
-        audio_choice = f"{background_config['audio'][2]}-{background_config['audio'][1]}"
-        background_audio = AudioFileClip(f"assets/backgrounds/audio/{audio_choice}")
-        start_time_audio, end_time_audio = get_start_and_end_times(
-            video_length, background_audio.duration
+        background_config["audio_window"] = get_start_and_end_times(
+            video_length, _media_duration(background_path(background_config, "audio"))
         )
-        background_audio = _subclip_compat(background_audio, start_time_audio, end_time_audio)
-        background_audio.write_audiofile(f"assets/temp/{id}/background.mp3")
 
     print_step("Finding a spot in the backgrounds video to chop...✂️")
-    video_choice = f"{background_config['video'][2]}-{background_config['video'][1]}"
-    background_video = VideoFileClip(f"assets/backgrounds/video/{video_choice}")
-    start_time_video, end_time_video = get_start_and_end_times(
-        video_length, background_video.duration
+    video_infos = ffmpeg_parse_infos(background_path(background_config, "video"))
+    background_config["video_window"] = get_start_and_end_times(
+        video_length, video_infos["duration"]
     )
-    # Extract video subclip
-    try:
-        if ffmpeg_extract_subclip is not None:
-            ffmpeg_extract_subclip(
-                f"assets/backgrounds/video/{video_choice}",
-                start_time_video,
-                end_time_video,
-                targetname=f"assets/temp/{id}/background.mp4",
-            )
-        else:
-            with VideoFileClip(f"assets/backgrounds/video/{video_choice}") as video:
-                new = _subclip_compat(video, start_time_video, end_time_video)
-                new.write_videofile(f"assets/temp/{id}/background.mp4")
-    except (OSError, IOError, TypeError, AttributeError):  # ffmpeg/moviepy compatibility
-        print_substep("FFMPEG issue. Trying again...")
-        with VideoFileClip(f"assets/backgrounds/video/{video_choice}") as video:
-            new = _subclip_compat(video, start_time_video, end_time_video)
-            new.write_videofile(f"assets/temp/{id}/background.mp4")
+    # The render keeps the footage's frame rate; the timeline snaps its cuts to those frames.
+    background_config["video_fps"] = video_infos.get("video_fps")
     print_substep("Background video chopped successfully!", style="bold green")
     return background_config["video"][2]
 
@@ -10,23 +10,31 @@ from pathlib import Path
 from typing import Dict, Final, Tuple
 
 import ffmpeg
-import translators
 from PIL import Image, ImageDraw, ImageFont
 from rich.console import Console
-from rich.progress import track
 
 from utils import settings
 from utils.cleanup import cleanup
 from utils.console import print_step, print_substep
 from utils.fonts import getheight
 from utils.thumbnail import create_thumbnail
+from utils.translation import translate
 from utils.videos import save_data
+from video_creation.background import background_path
+from video_creation.timeline import build_timeline
 
 console = Console()
 
+
 def sanitize_filename(title):
     # Remove invalid Windows filename characters and trailing whitespace
-    return re.sub(r'[\\/:*?"<>|]', '', title).strip()
+    return re.sub(r'[\\/:*?"<>|]', "", title).strip()
+
+
+def escape_tee_path(path: str) -> str:
+    # The tee muxer splits its outputs on "|" and reads "[...]" as options.
+    return re.sub(r"([\\'|\[\]])", r"\\\1", path)
+
 
 class ProgressFfmpeg(threading.Thread):
     def __init__(self, vid_duration_seconds, progress_update_callback):
@@ -68,6 +76,7 @@ class ProgressFfmpeg(threading.Thread):
     def __exit__(self, *args, **kwargs):
         self.stop()
 
+
 def name_normalize(name: str) -> str:
     name = re.sub(r'[?\\"%*:|<>]', "", name)
     name = re.sub(r"( [w,W]\s?\/\s?[o,O,0])", r" without", name)
@@ -79,34 +88,23 @@ def name_normalize(name: str) -> str:
     lang = settings.config["reddit"]["thread"]["post_lang"]
     if lang:
         print_substep("Translating filename...")
-        translated_name = translators.translate_text(name, translator="google", to_language=lang)
+        translated_name = translate(name, lang)
         return translated_name
     else:
         return name
 
-def prepare_background(reddit_id: str, W: int, H: int) -> str:
-    output_path = f"assets/temp/{reddit_id}/background_noaudio.mp4"
-    output = (
-        ffmpeg.input(f"assets/temp/{reddit_id}/background.mp4")
-        .filter("crop", f"ih*({W}/{H})", "ih")
-        .output(
-            output_path,
-            an=None,
-            **{
-                "c:v": "h264",
-                "b:v": "20M",
-                "b:a": "192k",
-                "threads": multiprocessing.cpu_count(),
-            },
-        )
-        .overwrite_output()
-    )
-    try:
-        output.run(quiet=True)
-    except ffmpeg.Error as e:
-        print(e.stderr.decode("utf8"))
-        exit(1)
-    return output_path
+
+def prepare_background(background_config: Dict[str, Tuple], W: int, H: int):
+    """Returns the cropped background footage as a stream of the final ffmpeg graph.
+
+    The library file is opened with input -ss/-t at the window chop_background picked, so
+    the render decodes only that stretch and no intermediate clip is written.
+    """
+    start, end = background_config["video_window"]
+    return ffmpeg.input(
+        background_path(background_config, "video"), ss=start, t=end - start
+    ).video.filter("crop", f"ih*({W}/{H})", "ih")
+
 
 def create_fancy_thumbnail(image, text, text_color, padding, wrap=35):
     print_step(f"Creating fancy thumbnail for: {text}")
@@ -164,24 +162,27 @@ def create_fancy_thumbnail(image, text, text_color, padding, wrap=35):
 
     return image
 
-def merge_background_audio(audio: ffmpeg, reddit_id: str):
-    """Gather an audio and merge with assets/backgrounds/background.mp3
+
+def merge_background_audio(audio: ffmpeg, background_config: Dict[str, Tuple]):
+    """Gather an audio and merge it with the background audio window picked by chop_background
     Args:
         audio (ffmpeg): The TTS final audio but without background.
-        reddit_id (str): The ID of subreddit
+        background_config (Dict[str,Tuple]): The background config, with its audio_window.
     """
     # Keep narration more consistent and foregrounded.
-    voice_audio = (
-        audio.filter("acompressor", threshold="-18dB", ratio=3, attack=5, release=80, makeup=4)
-        .filter("alimiter", limit=0.95)
-    )
+    voice_audio = audio.filter(
+        "acompressor", threshold="-18dB", ratio=3, attack=5, release=80, makeup=4
+    ).filter("alimiter", limit=0.95)
 
     background_audio_volume = settings.config["settings"]["background"]["background_audio_volume"]
-    if background_audio_volume == 0:
+    if background_audio_volume == 0 or not background_config.get("audio_window"):
         return voice_audio
     else:
         # sets volume to config
-        bg_audio = ffmpeg.input(f"assets/temp/{reddit_id}/background.mp3").filter(
+        start, end = background_config["audio_window"]
+        bg_audio = ffmpeg.input(
+            background_path(background_config, "audio"), ss=start, t=end - start
+        ).audio.filter(
             "volume",
             background_audio_volume,
         )
@@ -189,6 +190,7 @@ def merge_background_audio(audio: ffmpeg, reddit_id: str):
         merged_audio = ffmpeg.filter([voice_audio, bg_audio], "amix", duration="longest")
         return merged_audio
 
+
 def make_final_video(
     number_of_clips: int,
     length: int,
@@ -202,28 +204,15 @@ def make_final_video(
         reddit_obj (dict): The reddit object that contains the posts to read.
         background_config (Tuple[str, str, str, Any]): The background config to use.
     """
-    
-    # Helper function to safely get audio duration
-    def get_audio_duration(file_path):
-        try:
-            probe_result = ffmpeg.probe(file_path)
-            if "format" in probe_result and "duration" in probe_result["format"]:
-                return float(probe_result["format"]["duration"])
-            else:
-                print_substep(f"Warning: Could not find duration for {file_path}, using default 1.0 seconds")
-                return 1.0
-        except Exception as e:
-            print_substep(f"Error probing {file_path}: {e}, using default 1.0 seconds")
-            return 1.0
-    
+
+    reddit_id = re.sub(r"[^\w\s-]", "", reddit_obj["thread_id"])
+
     # settings values
     W: Final[int] = int(settings.config["settings"]["resolution_w"])
     H: Final[int] = int(settings.config["settings"]["resolution_h"])
 
     opacity = settings.config["settings"]["opacity"]
 
-    reddit_id = re.sub(r"[^\w\s-]", "", reddit_obj["thread_id"])
-
     allowOnlyTTSFolder: bool = (
         settings.config["settings"]["background"]["enable_extra_audio"]
         and settings.config["settings"]["background"]["background_audio_volume"] != 0
@@ -231,74 +220,15 @@ def make_final_video(
 
     print_step("Creating the final video 🎥")
 
-    background_clip = ffmpeg.input(prepare_background(reddit_id, W=W, H=H))
+    background_clip = prepare_background(background_config, W=W, H=H)
 
-    # Gather all audio clips
-    audio_clips = list()
-    if number_of_clips == 0 and settings.config["settings"]["storymode"] == "false" and not settings.config["settings"].get("hybrid_mode", False):
+    hybrid_mode = settings.config["settings"].get("hybrid_mode", False)
+    comment_mode = not hybrid_mode and not settings.config["settings"]["storymode"]
+    if number_of_clips == 0 and comment_mode:
         print(
             "No audio clips to gather. Please use a different TTS or post."
         )  # This is to fix the TypeError: unsupported operand type(s) for +: 'int' and 'NoneType'
         exit()
-        
-    # Handle hybrid mode - includes both post audio and comment audio
-    if settings.config["settings"].get("hybrid_mode", False):
-        audio_clips = [ffmpeg.input(f"assets/temp/{reddit_id}/mp3/title.mp3")]
-        
-        # Add post audio clips
-        if settings.config["settings"]["storymodemethod"] == 0:
-            audio_clips.append(ffmpeg.input(f"assets/temp/{reddit_id}/mp3/postaudio.mp3"))
-        elif settings.config["settings"]["storymodemethod"] == 1:
-            post_audio_count = len([f for f in os.listdir(f"assets/temp/{reddit_id}/mp3") if f.startswith("postaudio-")])
-            for i in range(post_audio_count):
-                audio_clips.append(ffmpeg.input(f"assets/temp/{reddit_id}/mp3/postaudio-{i}.mp3"))
-        
-        # Add comment audio clips
-        comment_audio_files = [f for f in os.listdir(f"assets/temp/{reddit_id}/mp3") if f.startswith("comment-")]
-        comment_audio_files.sort(key=lambda x: int(x.split('-')[1].split('.')[0]))  # Sort by comment number
-        for comment_file in comment_audio_files:
-            audio_clips.append(ffmpeg.input(f"assets/temp/{reddit_id}/mp3/{comment_file}"))
-            
-    elif settings.config["settings"]["storymode"]:
-        if settings.config["settings"]["storymodemethod"] == 0:
-            audio_clips = [ffmpeg.input(f"assets/temp/{reddit_id}/mp3/title.mp3")]
-            audio_clips.insert(1, ffmpeg.input(f"assets/temp/{reddit_id}/mp3/postaudio.mp3"))
-        elif settings.config["settings"]["storymodemethod"] == 1:
-            audio_clips = [
-                ffmpeg.input(f"assets/temp/{reddit_id}/mp3/postaudio-{i}.mp3")
-                for i in track(range(number_of_clips + 1), "Collecting the audio files...")
-            ]
-            audio_clips.insert(0, ffmpeg.input(f"assets/temp/{reddit_id}/mp3/title.mp3"))
-
-    else:
-        audio_clips = [
-            ffmpeg.input(f"assets/temp/{reddit_id}/mp3/{i}.mp3") for i in range(number_of_clips)
-        ]
-        audio_clips.insert(0, ffmpeg.input(f"assets/temp/{reddit_id}/mp3/title.mp3"))
-
-        audio_clips_durations = [
-            get_audio_duration(f"assets/temp/{reddit_id}/mp3/{i}.mp3")
-            for i in range(number_of_clips)
-        ]
-        audio_clips_durations.insert(
-            0,
-            get_audio_duration(f"assets/temp/{reddit_id}/mp3/title.mp3"),
-        )
-    audio_concat = ffmpeg.concat(*audio_clips, a=1, v=0)
-    ffmpeg.output(
-        audio_concat, f"assets/temp/{reddit_id}/audio.mp3", **{"b:a": "192k"}
-    ).overwrite_output().run(quiet=True)
-
-    console.log(f"[bold green] Video Will Be: {length} Seconds Long")
-
-    screenshot_width = int((W * 50) // 100)
-    # Prevent tall/vertical screenshots from overflowing in horizontal renders.
-    # Keep a safe max height so image content doesn't overlap surrounding UI/text.
-    screenshot_height = int((H * 88) // 100)
-    audio = ffmpeg.input(f"assets/temp/{reddit_id}/audio.mp3")
-    final_audio = merge_background_audio(audio, reddit_id)
-
-    image_clips = list()
 
     Path(f"assets/temp/{reddit_id}/png").mkdir(parents=True, exist_ok=True)
 
@@ -317,192 +247,42 @@ def make_final_video(
     title_img = create_fancy_thumbnail(title_template, title, font_color, padding)
 
     title_img.save(f"assets/temp/{reddit_id}/png/title.png")
-    image_clips.insert(
-        0,
-        ffmpeg.input(f"assets/temp/{reddit_id}/png/title.png")["v"].filter(
-            "scale", screenshot_width, screenshot_height, force_original_aspect_ratio="decrease"
-        ).filter("eq", contrast=1.03, saturation=1.04),
+
+    # One pass over the clips decides what plays when; the audio concat, the overlays and the
+    # progress bar all read it.
+    timeline = build_timeline(
+        reddit_id, number_of_clips, length, fps=background_config.get("video_fps")
     )
 
-    current_time = 0
-    
-    # Handle hybrid mode - combines story mode and comment mode visuals
-    if settings.config["settings"].get("hybrid_mode", False):
-        # Calculate durations for all audio clips (title + post + comments)
-        audio_clips_durations = []
-        
-        # Title duration
-        audio_clips_durations.append(
-            get_audio_duration(f"assets/temp/{reddit_id}/mp3/title.mp3")
-        )
-        
-        # Post audio durations
-        if settings.config["settings"]["storymodemethod"] == 0:
-            audio_clips_durations.append(
-                get_audio_duration(f"assets/temp/{reddit_id}/mp3/postaudio.mp3")
-            )
-        elif settings.config["settings"]["storymodemethod"] == 1:
-            post_audio_count = len([f for f in os.listdir(f"assets/temp/{reddit_id}/mp3") if f.startswith("postaudio-")])
-            for i in range(post_audio_count):
-                audio_clips_durations.append(
-                    get_audio_duration(f"assets/temp/{reddit_id}/mp3/postaudio-{i}.mp3")
-                )
-        
-        # Comment audio durations
-        comment_audio_files = [f for f in os.listdir(f"assets/temp/{reddit_id}/mp3") if f.startswith("comment-")]
-        comment_audio_files.sort(key=lambda x: int(x.split('-')[1].split('.')[0]))
-        for comment_file in comment_audio_files:
-            audio_clips_durations.append(
-                get_audio_duration(f"assets/temp/{reddit_id}/mp3/{comment_file}")
-            )
-        
-        # Handle visuals for hybrid mode
-        if settings.config["settings"]["storymodemethod"] == 0:
-            # Overlay title first (during title audio)
-            background_clip = background_clip.overlay(
-                image_clips[0],
-                enable=f"between(t,{current_time},{current_time + audio_clips_durations[0]})",
-                x="(main_w-overlay_w)/2",
-                y="(main_h-overlay_h)/2",
-            )
-            current_time += audio_clips_durations[0]
-            
-            # Single image for post content
-            image_clips.append(
-                ffmpeg.input(f"assets/temp/{reddit_id}/png/story_content.png").filter(
-                    "scale", screenshot_width, screenshot_height, force_original_aspect_ratio="decrease"
-                ).filter("eq", contrast=1.03, saturation=1.04)
-            )
-            # Overlay post content (after title finishes)
-            background_clip = background_clip.overlay(
-                image_clips[1],
-                enable=f"between(t,{current_time},{current_time + audio_clips_durations[1]})",
-                x="(main_w-overlay_w)/2",
-                y="(main_h-overlay_h)/2",
-            )
-            current_time += audio_clips_durations[1]
-            
-        elif settings.config["settings"]["storymodemethod"] == 1:
-            # Overlay title first (during title audio)
-            background_clip = background_clip.overlay(
-                image_clips[0],
-                enable=f"between(t,{current_time},{current_time + audio_clips_durations[0]})",
-                x="(main_w-overlay_w)/2",
-                y="(main_h-overlay_h)/2",
-            )
-            current_time += audio_clips_durations[0]
-            
-            # Multiple images for post content
-            clip_index = 1  # Start after title
-            post_audio_count = len([f for f in os.listdir(f"assets/temp/{reddit_id}/mp3") if f.startswith("postaudio-")])
-            
-            for i in range(post_audio_count):
-                image_clips.append(
-                    ffmpeg.input(f"assets/temp/{reddit_id}/png/img{i}.png")["v"].filter(
-                        "scale", screenshot_width, screenshot_height, force_original_aspect_ratio="decrease"
-                    )
-                )
-                background_clip = background_clip.overlay(
-                    image_clips[clip_index],
-                    enable=f"between(t,{current_time},{current_time + audio_clips_durations[clip_index]})",
-                    x="(main_w-overlay_w)/2",
-                    y="(main_h-overlay_h)/2",
-                )
-                current_time += audio_clips_durations[clip_index]
-                clip_index += 1
-        
-        # Add comment images
-        comment_count = len([f for f in os.listdir(f"assets/temp/{reddit_id}/mp3") if f.startswith("comment-")])
-        for i in range(comment_count):
-            comment_img_path = f"assets/temp/{reddit_id}/png/comment_{i + 1}.png"
-            if exists(comment_img_path):
-                image_clips.append(
-                    ffmpeg.input(comment_img_path)["v"].filter(
-                        "scale", screenshot_width, screenshot_height, force_original_aspect_ratio="decrease"
-                    )
-                )
-                background_clip = background_clip.overlay(
-                    image_clips[-1],
-                    enable=f"between(t,{current_time},{current_time + audio_clips_durations[len(audio_clips_durations) - comment_count + i]})",
-                    x="(main_w-overlay_w)/2",
-                    y="(main_h-overlay_h)/2",
-                )
-                current_time += audio_clips_durations[len(audio_clips_durations) - comment_count + i]
-                
-    elif settings.config["settings"]["storymode"]:
-        # Story mode supports two audio layouts:
-        # method 0 -> single postaudio.mp3
-        # method 1 -> postaudio-0.mp3, postaudio-1.mp3, ...
-        audio_clips_durations = [
-            get_audio_duration(f"assets/temp/{reddit_id}/mp3/title.mp3")
-        ]
-
-        if settings.config["settings"]["storymodemethod"] == 0:
-            postaudio_path = f"assets/temp/{reddit_id}/mp3/postaudio.mp3"
-            if exists(postaudio_path):
-                audio_clips_durations.append(get_audio_duration(postaudio_path))
-
-            image_clips.insert(
-                1,
-                ffmpeg.input(f"assets/temp/{reddit_id}/png/story_content.png").filter(
-                    "scale", screenshot_width, screenshot_height, force_original_aspect_ratio="decrease"
-                ).filter("eq", contrast=1.03, saturation=1.04),
-            )
-            # Overlay title first
-            background_clip = background_clip.overlay(
-                image_clips[0],
-                enable=f"between(t,{current_time},{current_time + audio_clips_durations[0]})",
-                x="(main_w-overlay_w)/2",
-                y="(main_h-overlay_h)/2",
-            )
-            current_time += audio_clips_durations[0]
-            # Then overlay story content (guard if postaudio missing)
-            post_duration = audio_clips_durations[1] if len(audio_clips_durations) > 1 else max(length - current_time, 0.1)
-            background_clip = background_clip.overlay(
-                image_clips[1],
-                enable=f"between(t,{current_time},{current_time + post_duration})",
-                x="(main_w-overlay_w)/2",
-                y="(main_h-overlay_h)/2",
-            )
-            current_time += post_duration
-        elif settings.config["settings"]["storymodemethod"] == 1:
-            audio_clips_durations.extend(
-                [
-                    get_audio_duration(f"assets/temp/{reddit_id}/mp3/postaudio-{i}.mp3")
-                    for i in range(number_of_clips)
-                ]
-            )
-            for i in track(range(0, number_of_clips + 1), "Collecting the image files..."):
-                image_clips.append(
-                    ffmpeg.input(f"assets/temp/{reddit_id}/png/img{i}.png")["v"].filter(
-                        "scale", screenshot_width, screenshot_height, force_original_aspect_ratio="decrease"
-                    )
-                )
-                background_clip = background_clip.overlay(
-                    image_clips[i],
-                    enable=f"between(t,{current_time},{current_time + audio_clips_durations[i]})",
-                    x="(main_w-overlay_w)/2",
-                    y="(main_h-overlay_h)/2",
-                )
-                current_time += audio_clips_durations[i]
-    else:
-        for i in range(0, number_of_clips + 1):
-            image_clips.append(
-                ffmpeg.input(f"assets/temp/{reddit_id}/png/comment_{i}.png")["v"].filter(
-                    "scale", screenshot_width, screenshot_height, force_original_aspect_ratio="decrease"
-                ).filter("eq", contrast=1.03, saturation=1.04)
-            )
-            image_overlay = image_clips[i].filter("colorchannelmixer", aa=opacity)
-            assert (
-                audio_clips_durations is not None
-            ), "Please make a GitHub issue if you see this. Ping @JasonLovesDoggo on GitHub."
-            background_clip = background_clip.overlay(
-                image_overlay,
-                enable=f"between(t,{current_time},{current_time + audio_clips_durations[i]})",
-                x="(main_w-overlay_w)/2",
-                y="(main_h-overlay_h)/2",
-            )
-            current_time += audio_clips_durations[i]
+    audio_clips = [
+        ffmpeg.input(segment.audio) for segment in timeline.segments if segment.audio is not None
+    ]
+    audio_concat = ffmpeg.concat(*audio_clips, a=1, v=0)
+    # Kept as PCM so the AAC encode of the final render is the only lossy step after the TTS.
+    ffmpeg.output(
+        audio_concat, f"assets/temp/{reddit_id}/audio.wav", **{"c:a": "pcm_s16le"}
+    ).overwrite_output().run(quiet=True)
+
+    console.log(f"[bold green] Video Will Be: {length} Seconds Long")
+
+    screenshot_width = int((W * 50) // 100)
+    # Prevent tall/vertical screenshots from overflowing in horizontal renders.
+    # Keep a safe max height so image content doesn't overlap surrounding UI/text.
+    screenshot_height = int((H * 88) // 100)
+    audio = ffmpeg.input(f"assets/temp/{reddit_id}/audio.wav")
+    final_audio = merge_background_audio(audio, background_config)
+
+    # All screenshots play as one timed image track, laid over the background by one overlay.
+    print_substep("Collecting the image files...")
+    image_track = timeline.write_image_track(
+        screenshot_width, screenshot_height, opacity=opacity if comment_mode else None
+    )
+    background_clip = background_clip.overlay(
+        ffmpeg.input(image_track, f="concat", safe=0)["v"],
+        x="(main_w-overlay_w)/2",
+        y="(main_h-overlay_h)/2",
+        eof_action="pass",
+    )
 
     title = re.sub(r"[^\w\s-]", "", reddit_obj["thread_title"])
     idx = re.sub(r"[^\w\s-]", "", reddit_obj["thread_id"])
@@ -565,35 +345,57 @@ def make_final_video(
         fontfile=os.path.join("fonts", "Roboto-Regular.ttf"),
     )
     background_clip = background_clip.filter("scale", W, H)
-    print_step("Rendering the video 🎥")
+    if allowOnlyTTSFolder:
+        print_step("Rendering the video and the Only TTS video in one pass 🎥")
+    else:
+        print_step("Rendering the video 🎥")
     from tqdm import tqdm
 
-    pbar = tqdm(total=100, desc="Progress: ", bar_format="{l_bar}{bar}", unit=" %")
+    pbar = tqdm(total=100, desc="Progress: ", bar_format="{l_bar}{bar}{postfix}", unit=" %")
+
+    # The render runs as long as the longer of the background window and the narration.
+    render_duration = max(length, timeline.duration)
 
     def on_update_example(progress) -> None:
+        progress = min(progress, 1.0)
         status = round(progress * 100, 2)
         old_percentage = pbar.n
         pbar.update(status - old_percentage)
+        segment = timeline.segment_at(progress * render_duration)
+        if segment is not None:
+            pbar.set_postfix_str(segment.name)
 
     defaultPath = f"results/{subreddit}"
-    with ProgressFfmpeg(length, on_update_example) as progress:
-        path = defaultPath + f"/{filename}"
-        path = (
-            path[:251] + ".mp4"
+    path = defaultPath + f"/{filename}"
+    path = path[:251] + ".mp4"  # Prevent a error by limiting the path length, do not change this.
+    render_args = {
+        "c:v": "h264",
+        "b:v": "20M",
+        "c:a": "aac",
+        "b:a": "192k",
+        "threads": multiprocessing.cpu_count(),
+    }
+    if allowOnlyTTSFolder:
+        only_tts_path = defaultPath + f"/OnlyTTS/{filename}"
+        only_tts_path = (
+            only_tts_path[:251] + ".mp4"
         )  # Prevent a error by limiting the path length, do not change this.
+        # One decode, one filter graph and one video encode: the tee muxer writes the encoded
+        # video to both files, each with its own audio stream (1 mixed, 2 narration only).
+        render = ffmpeg.output(
+            background_clip,
+            final_audio,
+            audio,
+            f"[f=mp4:select=0,1]{escape_tee_path(path)}"
+            f"|[f=mp4:select=0,2]{escape_tee_path(only_tts_path)}",
+            f="tee",
+            **render_args,
+        )
+    else:
+        render = ffmpeg.output(background_clip, final_audio, path, f="mp4", **render_args)
+    with ProgressFfmpeg(render_duration, on_update_example) as progress:
         try:
-            ffmpeg.output(
-                background_clip,
-                final_audio,
-                path,
-                f="mp4",
-                **{
-                    "c:v": "h264",
-                    "b:v": "20M",
-                    "b:a": "192k",
-                    "threads": multiprocessing.cpu_count(),
-                },
-            ).overwrite_output().global_args("-progress", progress.output_file.name).run(
+            render.overwrite_output().global_args("-progress", progress.output_file.name).run(
                 quiet=True,
                 overwrite_output=True,
                 capture_stdout=False,
@@ -604,37 +406,6 @@ def make_final_video(
             exit(1)
     old_percentage = pbar.n
     pbar.update(100 - old_percentage)
-    if allowOnlyTTSFolder:
-        path = defaultPath + f"/OnlyTTS/{filename}"
-        path = (
-            path[:251] + ".mp4"
-        )  # Prevent a error by limiting the path length, do not change this.
-        print_step("Rendering the Only TTS Video 🎥")
-        with ProgressFfmpeg(length, on_update_example) as progress:
-            try:
-                ffmpeg.output(
-                    background_clip,
-                    audio,
-                    path,
-                    f="mp4",
-                    **{
-                        "c:v": "h264",
-                        "b:v": "20M",
-                        "b:a": "192k",
-                        "threads": multiprocessing.cpu_count(),
-                    },
-                ).overwrite_output().global_args("-progress", progress.output_file.name).run(
-                    quiet=True,
-                    overwrite_output=True,
-                    capture_stdout=False,
-                    capture_stderr=False,
-                )
-            except ffmpeg.Error as e:
-                print(e.stderr.decode("utf8"))
-                exit(1)
-
-        old_percentage = pbar.n
-        pbar.update(100 - old_percentage)
     pbar.close()
     save_data(subreddit, filename + ".mp4", title, idx, background_config["video"][2])
     print_step("Removing temporary files 🗑")
@@ -3,7 +3,6 @@ import re
 from pathlib import Path
 from typing import Dict, Final
 
-import translators
 import requests
 from PIL import Image
 from playwright.sync_api import ViewportSize, sync_playwright
@@ -13,6 +12,7 @@ from utils import settings
 from utils.console import print_step, print_substep
 from utils.imagenarator import imagemaker
 from utils.playwright import clear_cookie_by_name
+from utils.translation import translate, translate_many
 from utils.videos import save_data
 
 __all__ = ["get_screenshots_of_reddit_posts"]
@@ -201,11 +201,12 @@ def get_screenshots_of_reddit_posts(reddit_object: dict, screenshot_num: int):
 
         if lang:
             print_substep("Translating post...")
-            texts_in_tl = translators.translate_text(
-                reddit_object["thread_title"],
-                to_language=lang,
-                translator="google",
-            )
+            # One batched lookup for the title and every comment; the TTS step usually
+            # translated the same strings already, so these are cache hits.
+            comments = reddit_object["comments"][:screenshot_num]
+            texts_in_tl = translate_many(
+                [reddit_object["thread_title"]] + [c["comment_body"] for c in comments], lang
+            )[0]
 
             page.evaluate(
                 "tl_content => document.querySelector('[data-adclicklocation=\"title\"] > div > div > h1').textContent = tl_content",
@@ -296,10 +297,8 @@ def get_screenshots_of_reddit_posts(reddit_object: dict, screenshot_num: int):
                 page.goto(f"https://new.reddit.com/{comment['comment_url']}")
 
                 if settings.config["reddit"]["thread"]["post_lang"]:
-                    comment_tl = translators.translate_text(
-                        comment["comment_body"],
-                        translator="google",
-                        to_language=settings.config["reddit"]["thread"]["post_lang"],
+                    comment_tl = translate(
+                        comment["comment_body"], settings.config["reddit"]["thread"]["post_lang"]
                     )
                     page.evaluate(
                         '([tl_content, tl_id]) => document.querySelector(`shreddit-comment[thingid="t1_${tl_id}"] > div:nth-child(2) > div > div[data-testid="comment"] > div`).textContent = tl_content',
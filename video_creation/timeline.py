@@ -0,0 +1,288 @@
+import os
+import re
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import ffmpeg
+import numpy as np
+from PIL import Image
+
+from utils import settings
+from utils.console import print_substep
+from utils.manifest import read_manifest
+
+# Used when the background's frame rate is unknown.
+DEFAULT_FPS: float = 30.0
+# The slight boost "enhance" screenshots get, as ffmpeg's eq=contrast=1.03:saturation=1.04.
+ENHANCE_CONTRAST: float = 1.03
+ENHANCE_SATURATION: float = 1.04
+
+
+class Segment(NamedTuple):
+    """One clip of the final video: its narration and the screenshot shown while it plays."""
+
+    name: str
+    audio: Optional[str]
+    image: Optional[str]
+    # Whether the screenshot gets the slight contrast/saturation boost.
+    enhance: bool
+    start: float
+    duration: float
+    # Frames [first_frame, end_frame) of the render that show this segment.
+    first_frame: int
+    end_frame: int
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+class Timeline:
+    """The ordered segments of a thread's final video.
+
+    The thread's audio and screenshot directories are listed once, durations come from the
+    TTS manifest (only clips missing from it are probed) and every start time is the running
+    sum of the durations before it, snapped to the frames of the render.
+
+    Args:
+        reddit_id (str): The sanitized thread id, as used under assets/temp.
+        fps (Optional) : Frame rate of the render; DEFAULT_FPS if unknown.
+    """
+
+    def __init__(self, reddit_id: str, fps: Optional[float] = None):
+        self.directory = f"assets/temp/{reddit_id}"
+        self.fps = float(fps or DEFAULT_FPS)
+        self.segments: List[Segment] = []
+        self._starts: List[float] = []
+        manifest = read_manifest(f"{self.directory}/mp3")
+        self._durations: Dict[str, float] = {
+            os.path.normpath(clip["path"]): clip["duration"] for clip in manifest
+        }
+        # Clips are WAV or the provider's own MP3; the manifest records which file each one is.
+        self._paths: Dict[str, str] = {clip["name"]: clip["path"] for clip in manifest}
+        self._audio_files = _listdir(f"{self.directory}/mp3")
+        self._images = set(_listdir(f"{self.directory}/png"))
+
+    @property
+    def duration(self) -> float:
+        return self.segments[-1].end if self.segments else 0.0
+
+    def audio_path(self, name) -> Optional[str]:
+        name = str(name)
+        if name in self._paths:
+            return self._paths[name]
+        for ext in ("wav", "mp3"):
+            if f"{name}.{ext}" in self._audio_files:
+                return f"{self.directory}/mp3/{name}.{ext}"
+        return None
+
+    def image_path(self, filename: str) -> Optional[str]:
+        return f"{self.directory}/png/{filename}" if filename in self._images else None
+
+    def numbered_clips(self, prefix: str) -> List[str]:
+        """Names of the "<prefix><n>" clips on disk, in numeric order."""
+        pattern = re.compile(rf"{re.escape(prefix)}(\d+)\.(?:wav|mp3)")
+        numbers = {
+            int(match.group(1)) for match in map(pattern.fullmatch, self._audio_files) if match
+        }
+        return [f"{prefix}{n}" for n in sorted(numbers)]
+
+    def add(
+        self,
+        name,
+        image: Optional[str],
+        enhance: bool = False,
+        fallback_duration: Optional[float] = None,
+    ) -> Optional[Segment]:
+        """Appends the clip called name, shown with the given screenshot file.
+
+        Args:
+            name: Clip name, e.g. "title", 3 or "postaudio-12".
+            image (Optional[str]): Screenshot file name in the png directory.
+            enhance (bool): Whether the screenshot gets the contrast/saturation boost.
+            fallback_duration (Optional[float]): Keeps the segment, silent, for this long if
+                its audio is missing. Without it a missing clip is left out.
+
+        Returns:
+            Optional[Segment]: The new segment, or None if it was left out.
+        """
+        audio = self.audio_path(name)
+        if audio is not None:
+            duration = self._duration(audio)
+        elif fallback_duration is not None:
+            duration = fallback_duration
+        else:
+            print_substep(f"Warning: No audio for clip {name}, leaving it out")
+            return None
+        start = self.duration
+        segment = Segment(
+            name=str(name),
+            audio=audio,
+            image=self.image_path(image) if image else None,
+            enhance=enhance,
+            start=start,
+            duration=duration,
+            first_frame=round(start * self.fps),
+            end_frame=round((start + duration) * self.fps),
+        )
+        self.segments.append(segment)
+        self._starts.append(start)
+        return segment
+
+    def segment_at(self, seconds: float) -> Optional[Segment]:
+        """The segment playing at the given time of the render, if any."""
+        idx = bisect_right(self._starts, seconds) - 1
+        if idx < 0 or seconds >= self.segments[idx].end:
+            return None
+        return self.segments[idx]
+
+    def write_image_track(self, width: int, height: int, opacity: Optional[float] = None) -> str:
+        """Writes the screenshots as one timed image track for the ffmpeg concat demuxer.
+
+        Every screenshot is scaled to fit width x height, enhanced and faded here, once, and
+        centred on a transparent canvas of a common size. The list shows each one for exactly
+        its segment's frames and a blank canvas wherever no screenshot is on screen, so the
+        render lays the whole track over the background with a single overlay.
+
+        Args:
+            width (int): Width of the box the screenshots are scaled to fit.
+            height (int): Height of that box.
+            opacity (Optional[float]): Alpha multiplier applied to every screenshot.
+
+        Returns:
+            str: Path of the concat list, to be opened with ffmpeg's concat demuxer.
+        """
+        directory = f"{self.directory}/png/track"
+        os.makedirs(directory, exist_ok=True)
+        sources = list(dict.fromkeys((s.image, s.enhance) for s in self.segments if s.image))
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            images = list(
+                executor.map(lambda source: _fit_image(*source, (width, height), opacity), sources)
+            )
+        canvas = (
+            max((i.width for i in images), default=1),
+            max((i.height for i in images), default=1),
+        )
+
+        def save(args: Tuple[int, Image.Image]):
+            idx, image = args
+            framed = Image.new("RGBA", canvas)
+            framed.paste(image, ((canvas[0] - image.width) // 2, (canvas[1] - image.height) // 2))
+            framed.save(f"{directory}/{idx}.png", compress_level=1)
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            list(executor.map(save, enumerate(images + [Image.new("RGBA", (1, 1))])))
+        files = {source: f"{idx}.png" for idx, source in enumerate(sources)}
+        blank = f"{len(images)}.png"
+
+        # (file, first frame) changes; a segment without a screenshot shows the blank canvas.
+        changes = []
+        for segment in self.segments:
+            file = files[(segment.image, segment.enhance)] if segment.image else blank
+            if segment.end_frame <= segment.first_frame:
+                continue
+            if changes and changes[-1][0] == file:
+                continue
+            changes.append((file, segment.first_frame))
+        changes.append((blank, round(self.duration * self.fps)))
+
+        # Switching half a frame early means no frame timestamp can land on a rounding edge.
+        # Images are stamped in 1/25 s by default, too coarse for that; use milliseconds.
+        lines = ["ffconcat version 1.0"]
+        for (file, first_frame), (_, next_frame) in zip(changes, changes[1:]):
+            start = max(first_frame - 0.5, 0) / self.fps
+            lines.append(f"file '{file}'")
+            lines.append("option framerate 1000")
+            lines.append(f"duration {(next_frame - 0.5) / self.fps - start:.6f}")
+        lines.append(f"file '{blank}'")
+        lines.append("option framerate 1000")
+        path = f"{directory}/track.txt"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def _duration(self, path: str) -> float:
+        if os.path.normpath(path) in self._durations:
+            return self._durations[os.path.normpath(path)]
+        try:
+            probe_result = ffmpeg.probe(path)
+            if "format" in probe_result and "duration" in probe_result["format"]:
+                return float(probe_result["format"]["duration"])
+            print_substep(f"Warning: Could not find duration for {path}, using default 1.0 seconds")
+        except Exception as e:
+            print_substep(f"Error probing {path}: {e}, using default 1.0 seconds")
+        return 1.0
+
+
+def _fit_image(
+    path: str, enhance: bool, box: Tuple[int, int], opacity: Optional[float]
+) -> Image.Image:
+    """Scales a screenshot to fit box, like ffmpeg's force_original_aspect_ratio=decrease."""
+    image = Image.open(path).convert("RGBA")
+    scale = min(box[0] / image.width, box[1] / image.height)
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    image = image.resize(size, Image.BICUBIC)
+    alpha = image.getchannel("A")
+    if enhance:
+        # eq works on YUV: contrast stretches luma and saturation chroma, both around mid-grey.
+        ycbcr = np.asarray(image.convert("YCbCr"), dtype=np.float32)
+        ycbcr[..., 0] = (ycbcr[..., 0] - 128) * ENHANCE_CONTRAST + 128
+        ycbcr[..., 1:] = (ycbcr[..., 1:] - 128) * ENHANCE_SATURATION + 128
+        image = Image.fromarray(np.clip(ycbcr, 0, 255).round().astype(np.uint8), "YCbCr")
+        image = image.convert("RGBA")
+    if opacity is not None:
+        alpha = alpha.point(lambda a: round(a * float(opacity)))
+    image.putalpha(alpha)
+    return image
+
+
+def _listdir(path: str) -> List[str]:
+    try:
+        return os.listdir(path)
+    except OSError:
+        return []
+
+
+def build_timeline(
+    reddit_id: str, number_of_clips: int, length: int, fps: Optional[float] = None
+) -> Timeline:
+    """Lays out the title, post and comment clips of the configured mode.
+
+    Args:
+        reddit_id (str): The sanitized thread id, as used under assets/temp.
+        number_of_clips (int): Clip count returned by the TTS stage.
+        length (int): Length of the video, used if the story audio is missing.
+        fps (Optional) : Frame rate of the render.
+
+    Returns:
+        Timeline: The segments, in playback order.
+    """
+    config = settings.config["settings"]
+    timeline = Timeline(reddit_id, fps)
+    timeline.add("title", "title.png", enhance=True)
+
+    if config.get("hybrid_mode", False):
+        if config["storymodemethod"] == 0:
+            timeline.add("postaudio", "story_content.png", enhance=True)
+        elif config["storymodemethod"] == 1:
+            for name in timeline.numbered_clips("postaudio-"):
+                timeline.add(name, f"img{name.split('-')[1]}.png")
+        for rank, name in enumerate(timeline.numbered_clips("comment-")):
+            timeline.add(name, f"comment_{rank + 1}.png")
+    elif config["storymode"]:
+        if config["storymodemethod"] == 0:
+            timeline.add(
+                "postaudio",
+                "story_content.png",
+                enhance=True,
+                fallback_duration=max(length - timeline.duration, 0.1),
+            )
+        elif config["storymodemethod"] == 1:
+            for i in range(number_of_clips + 1):
+                timeline.add(f"postaudio-{i}", f"img{i}.png")
+    else:
+        # Comment screenshots are numbered from 1, the comment clips from 0.
+        for i in range(number_of_clips):
+            timeline.add(i, f"comment_{i + 1}.png", enhance=True)
+    return timeline
@@ -1,28 +1,23 @@
+import importlib
 from typing import Tuple
 
 from rich.console import Console
 
-from TTS.aws_polly import AWSPolly
-from TTS.elevenlabs import elevenlabs
 from TTS.engine_wrapper import TTSEngine
-from TTS.GTTS import GTTS
-from TTS.pyttsx import pyttsx
-from TTS.qwen3_clone import Qwen3Clone
-from TTS.streamlabs_polly import StreamlabsPolly
-from TTS.TikTok import TikTok
 from utils import settings
 from utils.console import print_step, print_table
 
 console = Console()
 
+# Provider name -> "module:class". Only the chosen provider's module (and its SDK) is imported.
 TTSProviders = {
-    "GoogleTranslate": GTTS,
-    "AWSPolly": AWSPolly,
-    "StreamlabsPolly": StreamlabsPolly,
-    "TikTok": TikTok,
-    "pyttsx": pyttsx,
-    "Qwen3Clone": Qwen3Clone,
-    "ElevenLabs": elevenlabs,
+    "GoogleTranslate": "TTS.GTTS:GTTS",
+    "AWSPolly": "TTS.aws_polly:AWSPolly",
+    "StreamlabsPolly": "TTS.streamlabs_polly:StreamlabsPolly",
+    "TikTok": "TTS.TikTok:TikTok",
+    "pyttsx": "TTS.pyttsx:pyttsx",
+    "Qwen3Clone": "TTS.qwen3_clone:Qwen3Clone",
+    "ElevenLabs": "TTS.elevenlabs:elevenlabs",
 }
 
 
@@ -38,7 +33,7 @@ def save_text_to_mp3(reddit_obj) -> Tuple[int, int]:
 
     voice = settings.config["settings"]["tts"]["voice_choice"]
     if str(voice).casefold() in map(lambda _: _.casefold(), TTSProviders):
-        text_to_mp3 = TTSEngine(get_case_insensitive_key_value(TTSProviders, voice), reddit_obj)
+        text_to_mp3 = TTSEngine(get_provider(voice), reddit_obj)
     else:
         while True:
             print_step("Please choose one of the following TTS providers: ")
@@ -47,10 +42,26 @@ def save_text_to_mp3(reddit_obj) -> Tuple[int, int]:
             if choice.casefold() in map(lambda _: _.casefold(), TTSProviders):
                 break
             print("Unknown Choice")
-        text_to_mp3 = TTSEngine(get_case_insensitive_key_value(TTSProviders, choice), reddit_obj)
+        text_to_mp3 = TTSEngine(get_provider(choice), reddit_obj)
     return text_to_mp3.run()
 
 
+def get_provider(name: str):
+    """Imports and returns the provider class registered under name (case-insensitive).
+
+    Args:
+        name (str): Provider name, as in the voice_choice setting.
+
+    Returns:
+        type|None: The provider class, or None if no provider has that name.
+    """
+    target = get_case_insensitive_key_value(TTSProviders, name)
+    if target is None:
+        return None
+    module, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
 def get_case_insensitive_key_value(input_dict, key):
     return next(
         (value for dict_key, value in input_dict.items() if dict_key.lower() == key.lower()),